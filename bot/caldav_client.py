@@ -1,10 +1,10 @@
 import datetime
 import logging
-import pytz
 
 from caldav import DAVClient, Calendar
 from bot.config import BotConfig
 from bot.encryption import EncryptionManager
+from bot.event_record import EventRecord
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +14,9 @@ def unify_dt_to_utc(dt: datetime.datetime) -> datetime.datetime:
     и убирает tzinfo (делает "naive", но фактически это UTC).
     """
     if dt.tzinfo is None:
-        dt = pytz.UTC.localize(dt)
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
     else:
-        dt = dt.astimezone(pytz.UTC)
+        dt = dt.astimezone(datetime.timezone.utc)
 
     dt = dt.replace(second=0, microsecond=0)
     return dt.replace(tzinfo=None)
@@ -38,7 +38,8 @@ class CalDavClient:
         self.client = DAVClient(
             url=direct_url,
             username=BotConfig.CALDAV_USERNAME,
-            password=decrypted_password
+            password=decrypted_password,
+            timeout=(BotConfig.CALDAV_CONNECT_TIMEOUT, BotConfig.CALDAV_READ_TIMEOUT)
         )
         self.calendar = None
         logger.debug("CalDavClient __init__ done.")
@@ -60,7 +61,7 @@ class CalDavClient:
 
     def get_upcoming_events(self, start_dt: datetime.datetime, end_dt: datetime.datetime):
         """
-        Возвращает список событий (dict) из календаря за [start_dt, end_dt].
+        Возвращает список EventRecord из календаря за [start_dt, end_dt].
         start_dt/end_dt - в локальном времени, здесь приводим их
         к "naive UTC" через unify_dt_to_utc.
         """
@@ -87,6 +88,11 @@ class CalDavClient:
             uid = event_data.uid.value
             dt_start = event_data.dtstart.value
             dt_end = event_data.dtend.value
+            # У экземпляров повторяющейся встречи общий uid, различает их RECURRENCE-ID
+            recurrence_id = (
+                event_data.recurrence_id.value.isoformat()
+                if hasattr(event_data, "recurrence_id") else ""
+            )
 
             dt_start_utc = unify_dt_to_utc(dt_start)
             dt_end_utc = unify_dt_to_utc(dt_end)
@@ -96,12 +102,9 @@ class CalDavClient:
                 i, uid, title, dt_start_utc.isoformat(), dt_end_utc.isoformat()
             )
 
-            events.append({
-                "event_id": uid,
-                "title": title,
-                "start": dt_start_utc,  # naive UTC
-                "end": dt_end_utc      # naive UTC
-            })
+            # Локальное время, тех.флаг и пересечение с планёркой
+            # считаются здесь один раз на событие
+            events.append(EventRecord.build(uid, title, dt_start_utc, dt_end_utc, recurrence_id))
 
         logger.info(
             "Found %d events in calendar for the period [%s - %s].",
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+from bot.caldav_client import CalDavClient
+from bot.config import BotConfig
+from bot.db import Database
+from bot.event_record import EventRecord, day_bounds, utc_now
+from bot.models.calendar_snapshot import CalendarSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Базовая задержка между повторами, секунды (растёт как 2**попытка, с jitter)
+RETRY_BASE_DELAY = 1.0
+
+class CircuitOpenError(Exception):
+    """Календарь недавно падал подряд, запрос не отправляем."""
+
+class CircuitBreaker:
+    """
+    Простой circuit breaker: после failure_threshold ошибок подряд
+    запросы не пропускаются reset_timeout секунд, затем пропускается
+    одна пробная попытка (half-open).
+    """
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        # Когда пропущена пробная попытка half-open; пока она не вернулась,
+        # остальные запросы не пропускаются
+        self.probe_started_at = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Пробная попытка, отменённая без результата, не держит цепь вечно
+        if self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout:
+            return False
+        self.probe_started_at = now
+        return True
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("CalDAV circuit closed.")
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self):
+        self.probe_started_at = None
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("CalDAV circuit opened after %d failures.", self.failures)
+            self.opened_at = time.monotonic()
+
+class CalendarService:
+    """
+    Обёртка над CalDavClient для фоновых задач и команд.
+
+    Запросы идут в отдельном потоке (не блокируют event loop), с
+    таймаутами, повторами с jitter и circuit breaker. Последний удачный
+    ответ за сегодня хранится в памяти и в calendar_snapshots, чтобы при
+    медленном/недоступном календаре было что показать.
+    """
+    _client = None
+    _breaker = CircuitBreaker()
+    _snapshot = None       # (day, fetched_at, events)
+    _refresh_task = None
+
+    @classmethod
+    def _fetch_sync(cls, start_dt: datetime, end_dt: datetime):
+        if cls._client is None:
+            cls._client = CalDavClient()
+        try:
+            return cls._client.get_upcoming_events(start_dt, end_dt)
+        except Exception:
+            # Соединение могло остаться в плохом состоянии — пересоздадим
+            cls._client = None
+            raise
+
+    @classmethod
+    async def fetch(cls, start_dt: datetime, end_dt: datetime):
+        """get_upcoming_events() с повторами и circuit breaker."""
+        last_exc = None
+        for attempt in range(BotConfig.CALDAV_RETRIES):
+            if not cls._breaker.allow():
+                raise CircuitOpenError("CalDAV circuit is open")
+            try:
+                events = await asyncio.to_thread(cls._fetch_sync, start_dt, end_dt)
+            except Exception as exc:
+                last_exc = exc
+                cls._breaker.record_failure()
+                logger.warning("CalDAV request failed (attempt %d): %s", attempt + 1, exc)
+                if attempt + 1 < BotConfig.CALDAV_RETRIES:
+                    await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt))
+                continue
+            cls._breaker.record_success()
+            return events
+        raise last_exc
+
+    @classmethod
+    async def refresh_today(cls, now_msk: datetime):
+        """
+        Свежие события за сегодня. Параллельные вызовы ждут один и тот же
+        запрос. При ошибке бросает исключение — снимок не подменяет данные.
+        """
+        if cls._refresh_task is None or cls._refresh_task.done():
+            cls._refresh_task = asyncio.create_task(cls._refresh(now_msk))
+            cls._refresh_task.add_done_callback(cls._on_refresh_done)
+        return await asyncio.shield(cls._refresh_task)
+
+    @classmethod
+    async def get_today_events(cls, now_msk: datetime, wait: float):
+        """
+        Ждёт свежие данные не дольше wait секунд, иначе отдаёт снимок,
+        а обновление продолжается в фоне.
+        Возвращает (events или None, fetched_at или None, fresh).
+        """
+        try:
+            events = await asyncio.wait_for(cls.refresh_today(now_msk), timeout=wait)
+            return events, cls._snapshot[1], True
+        except Exception as exc:
+            logger.warning("Using calendar snapshot instead of fresh data: %r", exc)
+        snapshot = cls.snapshot(now_msk.date())
+        if snapshot is None:
+            return None, None, False
+        return snapshot[2], snapshot[1], False
+
+    @classmethod
+    def snapshot(cls, day):
+        """(day, fetched_at, events) из памяти или из БД, либо None."""
+        if cls._snapshot is not None and cls._snapshot[0] == day:
+            return cls._snapshot
+
+        db_sess = Database.get_session()
+        try:
+            row = db_sess.get(CalendarSnapshot, day)
+            if row is None:
+                return None
+            events = [
+                EventRecord.build(
+                    e["event_id"],
+                    e["title"],
+                    datetime.fromisoformat(e["start"]),
+                    datetime.fromisoformat(e["end"]),
+                    e.get("recurrence_id", "")
+                )
+                for e in row.events
+            ]
+            cls._snapshot = (day, row.fetched_at, events)
+            return cls._snapshot
+        finally:
+            db_sess.close()
+
+    @classmethod
+    async def _refresh(cls, now_msk: datetime):
+        events = await cls.fetch(*day_bounds(now_msk))
+        fetched_at = utc_now()
+        cls._snapshot = (now_msk.date(), fetched_at, events)
+        await asyncio.to_thread(cls._persist, now_msk.date(), fetched_at, events)
+        return events
+
+    @staticmethod
+    def _persist(day, fetched_at: datetime, events):
+        db_sess = Database.get_session()
+        try:
+            db_sess.merge(CalendarSnapshot(
+                day=day,
+                fetched_at=fetched_at,
+                events=[
+                    {
+                        "event_id": e.event_id,
+                        "title": e.title,
+                        "start": e.start.isoformat(),
+                        "end": e.end.isoformat(),
+                        "recurrence_id": e.recurrence_id,
+                    }
+                    for e in events
+                ]
+            ))
+            db_sess.commit()
+        except Exception:
+            logger.exception("Failed to persist calendar snapshot.")
+        finally:
+            db_sess.close()
+
+    @staticmethod
+    def _on_refresh_done(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Calendar refresh failed: %r", task.exception())
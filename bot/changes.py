@@ -0,0 +1,50 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+
+from bot.event_record import EventRecord, normalize_title
+
+logger = logging.getLogger(__name__)
+
+TOLERANCE_SECONDS = 240  # 4 минуты
+
+def times_differ_enough(dt_old: datetime, dt_new: datetime) -> bool:
+    diff_sec = abs((dt_new - dt_old).total_seconds())
+    return diff_sec >= TOLERANCE_SECONDS
+
+class ChangeKind(Enum):
+    MOVED = "moved"
+    RENAMED = "renamed"
+    RECLASSIFIED = "reclassified"
+
+@dataclass(frozen=True)
+class EventChange:
+    """
+    Одно изменение встречи относительно строки в events.
+      MOVED        — old/new: (start_time, end_time) в "naive UTC"
+      RENAMED      — old/new: title
+      RECLASSIFIED — old/new: is_technical
+    """
+    kind: ChangeKind
+    old: object
+    new: object
+
+def detect_changes(existing, record: EventRecord):
+    """
+    Сравнивает строку Event с записью из календаря.
+    Вызывается, только если отпечатки (fingerprint) не совпали.
+    """
+    changes = []
+    if (times_differ_enough(existing.start_time, record.start)
+            or times_differ_enough(existing.end_time, record.end)):
+        changes.append(EventChange(
+            ChangeKind.MOVED,
+            (existing.start_time, existing.end_time),
+            (record.start, record.end)
+        ))
+    if normalize_title(existing.title or "") != normalize_title(record.title):
+        changes.append(EventChange(ChangeKind.RENAMED, existing.title, record.title))
+    if bool(existing.is_technical) != record.is_technical:
+        changes.append(EventChange(ChangeKind.RECLASSIFIED, bool(existing.is_technical), record.is_technical))
+    return changes
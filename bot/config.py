@@ -18,12 +18,31 @@ class BotConfig:
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+    # Таймауты и повторы запросов к CalDAV (секунды)
+    CALDAV_CONNECT_TIMEOUT = float(os.getenv("CALDAV_CONNECT_TIMEOUT", "5"))
+    CALDAV_READ_TIMEOUT = float(os.getenv("CALDAV_READ_TIMEOUT", "20"))
+    CALDAV_RETRIES = int(os.getenv("CALDAV_RETRIES", "3"))
+    # Сколько утренняя рассылка ждёт свежий календарь, прежде чем взять снимок
+    CALDAV_DIGEST_WAIT_SECONDS = float(os.getenv("CALDAV_DIGEST_WAIT_SECONDS", "30"))
+
+    # Telegram id администраторов через запятую (/profile, /latency)
+    ADMIN_USER_IDS = {
+        uid.strip() for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip()
+    }
+    # Порог, после которого задержка event loop / обработчика пишется в лог
+    LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "500"))
+
     SUPPORT_CHAT_ID = int(os.getenv("SUPPORT_CHAT_ID", "0"))
     SALES_CHAT_ID = int(os.getenv("SALES_CHAT_ID", "0"))
 
     CHECK_INTERVAL_MINUTES = int(os.getenv("CHECK_INTERVAL_MINUTES", "30"))
     DAILY_NOTIFICATION_HOUR = int(os.getenv("DAILY_NOTIFICATION_HOUR", "20"))
     MORNING_REPORT_HOUR = int(os.getenv("MORNING_REPORT_HOUR", "7"))
+    # За сколько минут до начала взятой встречи напомнить сотруднику
+    REMINDER_MINUTES = int(os.getenv("REMINDER_MINUTES", "15"))
+    # Рабочие часы техподдержки для поиска свободных окон (/free)
+    WORK_DAY_START_HOUR = int(os.getenv("WORK_DAY_START_HOUR", "10"))
+    WORK_DAY_END_HOUR = int(os.getenv("WORK_DAY_END_HOUR", "19"))
 
     logger.debug(
         "BotConfig loaded: SUPPORT_CHAT_ID=%d, SALES_CHAT_ID=%d, MORNING_REPORT_HOUR=%d",
@@ -0,0 +1,143 @@
+import bisect
+import logging
+from datetime import datetime
+
+from bot.db import Database
+from bot.event_record import utc_now
+from bot.models.events import Event
+
+logger = logging.getLogger(__name__)
+
+class ConflictDetector:
+    """
+    Пересечения взятых встреч у одного сотрудника.
+
+    Для каждого taken_by храним отсортированный по началу список
+    (start_time, end_time, event_id) в "naive UTC" и рядом — префиксный
+    максимум концов (max_end[i] = max(end[0..i])). Поиск пересечения —
+    bisect: справа берутся встречи, начинающиеся до конца нового интервала,
+    слева — только начиная с первой позиции, где max_end перешёл за начало
+    нового интервала. Так находится и длинная встреча, накрывающая новую,
+    когда ближайший сосед слева уже закончился.
+    """
+    _by_user = {}    # taken_by -> [(start, end, event_id), ...]
+    _max_end = {}    # taken_by -> [max(end[0..i]), ...]
+    _by_event = {}   # event_id -> (taken_by, start, end, title)
+
+    @classmethod
+    def load(cls):
+        """Одним range-запросом поднимает все ещё не закончившиеся взятые встречи."""
+        cls._by_user = {}
+        cls._max_end = {}
+        cls._by_event = {}
+        db_sess = Database.get_session()
+        try:
+            rows = db_sess.query(
+                Event.event_id, Event.title, Event.start_time, Event.end_time, Event.taken_by
+            ).filter(
+                Event.end_time > utc_now(),
+                Event.is_taken.is_(True),
+                Event.taken_by.isnot(None)
+            ).order_by(Event.start_time).all()
+        finally:
+            db_sess.close()
+
+        for row in rows:
+            cls.add(row.taken_by, row.event_id, row.title, row.start_time, row.end_time)
+        logger.info("ConflictDetector loaded %d taken meetings.", len(cls._by_event))
+
+    @classmethod
+    def find_conflicts(cls, user: str, start: datetime, end: datetime, exclude: str = None):
+        """Возвращает список (event_id, title) встреч user, пересекающих [start, end)."""
+        intervals = cls._by_user.get(user, [])
+        max_end = cls._max_end.get(user, [])
+        idx = bisect.bisect_left(intervals, (start,))
+        found = []
+
+        # Слева: max_end не убывает, так что раньше первой позиции, где он
+        # больше start, все встречи закончились до start
+        for j in range(bisect.bisect_right(max_end, start, 0, idx), idx):
+            if intervals[j][1] > start and intervals[j][2] != exclude:
+                found.append(intervals[j][2])
+
+        # Справа: все, что начинаются до конца нового интервала
+        while idx < len(intervals) and intervals[idx][0] < end:
+            if intervals[idx][2] != exclude:
+                found.append(intervals[idx][2])
+            idx += 1
+
+        return [(ev_id, cls._by_event[ev_id][3]) for ev_id in found]
+
+    @classmethod
+    def add(cls, user: str, event_id: str, title: str, start: datetime, end: datetime):
+        cls.remove(event_id)
+        intervals = cls._by_user.setdefault(user, [])
+        idx = bisect.bisect_left(intervals, (start, end, event_id))
+        intervals.insert(idx, (start, end, event_id))
+        cls._update_max_end(user, idx)
+        cls._by_event[event_id] = (user, start, end, title)
+
+    @classmethod
+    def _update_max_end(cls, user: str, idx: int):
+        """Пересчитывает префиксный максимум концов с позиции idx (как и insort — O(n))."""
+        intervals = cls._by_user[user]
+        max_end = cls._max_end.setdefault(user, [])
+        del max_end[idx:]
+        running = max_end[-1] if max_end else None
+        for _start, end, _ev_id in intervals[idx:]:
+            running = end if running is None else max(running, end)
+            max_end.append(running)
+
+    @classmethod
+    def remove(cls, event_id: str):
+        entry = cls._by_event.pop(event_id, None)
+        if entry is None:
+            return
+        user, start, end, _title = entry
+        intervals = cls._by_user[user]
+        idx = bisect.bisect_left(intervals, (start, end, event_id))
+        if idx < len(intervals) and intervals[idx][2] == event_id:
+            intervals.pop(idx)
+            cls._update_max_end(user, idx)
+        if not intervals:
+            del cls._by_user[user]
+            del cls._max_end[user]
+
+    @classmethod
+    def move(cls, event_id: str, title: str, start: datetime, end: datetime):
+        """
+        Переносит интервал взятой встречи, возвращает (taken_by, пересечения)
+        после переноса. Для невзятой встречи — (None, []).
+        """
+        entry = cls._by_event.get(event_id)
+        if entry is None:
+            return None, []
+        user = entry[0]
+        cls.add(user, event_id, title, start, end)
+        return user, cls.find_conflicts(user, start, end, exclude=event_id)
+
+    @classmethod
+    def prune(cls, before: datetime):
+        """Выбрасывает встречи, закончившиеся до before."""
+        for ev_id in [k for k, v in cls._by_event.items() if v[2] <= before]:
+            cls.remove(ev_id)
+
+    @classmethod
+    def sweep(cls):
+        """
+        Sweep-line по каждому сотруднику: возвращает все пары пересекающихся
+        встреч как (taken_by, (start, title), (start, title)).
+        """
+        pairs = []
+        for user, intervals in cls._by_user.items():
+            active = []  # уже открытые интервалы, которые ещё не закончились
+            for start, end, ev_id in intervals:
+                active = [a for a in active if a[1] > start]
+                for a_start, _a_end, a_id in active:
+                    pairs.append((
+                        user,
+                        (a_start, cls._by_event[a_id][3]),
+                        (start, cls._by_event[ev_id][3])
+                    ))
+                active.append((start, end, ev_id))
+        return pairs
@@ -1,11 +1,21 @@
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from bot.config import BotConfig
 
 logger = logging.getLogger(__name__)
 Base = declarative_base()
 
+# create_all() не трогает уже существующие таблицы, поэтому новые колонки
+# и индексы досоздаём идемпотентными DDL-выражениями.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS taken_by_user_id VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_events_start_time ON events (start_time)",
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS fingerprint VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_events_taken_by_start_time ON events (taken_by, start_time)",
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS reminded_at TIMESTAMP",
+]
+
 class Database:
     _engine = None
     SessionLocal = None
@@ -22,8 +32,16 @@ class Database:
             cls._engine = create_engine(db_url, echo=False)
             cls.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=cls._engine)
             Base.metadata.create_all(bind=cls._engine)
+            cls.upgrade_schema()
             logger.info("Database initialized (tables created).")
 
+    @classmethod
+    def upgrade_schema(cls):
+        with cls._engine.begin() as conn:
+            for stmt in SCHEMA_UPGRADES:
+                logger.debug("Schema upgrade: %s", stmt)
+                conn.execute(text(stmt))
+
     @classmethod
     def get_session(cls):
         if cls._engine is None:
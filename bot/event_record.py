@@ -0,0 +1,142 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MOSCOW_ZONE = ZoneInfo("Europe/Moscow")
+
+# Планёрки техподдержки по дням недели, минуты от начала дня:
+#   - Понедельник 15:00–16:00
+#   - Пятница     15:00–17:00
+SUPPORT_PLANNING_WINDOWS = {
+    0: (15 * 60, 16 * 60),
+    4: (15 * 60, 17 * 60),
+}
+
+TECHNICAL_KEYWORDS = (
+    "тех.встреча",
+    "тех. встреча",
+    "техвстреча",
+    "тех встреча",
+    "технич. встреча",
+    "техничиская встреча",
+    "техническая встреча",
+    "техническая",
+    "technical meeting",
+    "тех.вкс",
+    "тех. вкс",
+    "тех.созвон",
+    "тех. созвон",
+    "тех созвон",
+    "[тех встреча]",
+    "(тех встреча)",
+    "техконсультация",
+    "тех.консультация",
+    "технические вопросы",
+)
+
+def detect_if_technical(title: str) -> bool:
+    lower_title = title.lower()
+    return any(k in lower_title for k in TECHNICAL_KEYWORDS)
+
+def is_excluded_planerka(title: str) -> bool:
+    """
+    Проверяем, является ли событие планёркой:
+      - Если title ровно "Support планёрка"
+      - Или title ровно "Большая планерка"
+    Тогда исключаем из любых оповещений
+    """
+    lower_t = title.lower().strip()
+    return lower_t == "support планёрка" or lower_t == "большая планерка"
+
+def is_overlap_with_support_planning(local_start: datetime, local_end: datetime) -> bool:
+    """
+    Проверяем пересечение с планёрками техподдержки (SUPPORT_PLANNING_WINDOWS).
+    local_start/local_end — московское время.
+    """
+    window = SUPPORT_PLANNING_WINDOWS.get(local_start.weekday())  # 0=Пн, 4=Пт
+    if window is None:
+        return False
+    plan_s = local_start.replace(hour=window[0] // 60, minute=window[0] % 60, second=0, microsecond=0)
+    plan_e = local_start.replace(hour=window[1] // 60, minute=window[1] % 60, second=0, microsecond=0)
+    return local_start < plan_e and plan_s < local_end
+
+def utc_now() -> datetime:
+    """Текущее время в "naive UTC" — в том же виде, что и в таблице events."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def moscow_now() -> datetime:
+    """Текущее московское время (aware)."""
+    return datetime.now(MOSCOW_ZONE)
+
+def to_local(dt_utc: datetime) -> datetime:
+    """"naive UTC" -> московское время (aware)."""
+    return dt_utc.replace(tzinfo=timezone.utc).astimezone(MOSCOW_ZONE)
+
+def to_utc(dt: datetime) -> datetime:
+    """aware datetime -> "naive UTC"."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+def day_start_utc(day: date) -> datetime:
+    """Начало московского дня в "naive UTC"."""
+    return to_utc(datetime(day.year, day.month, day.day, tzinfo=MOSCOW_ZONE))
+
+def day_bounds(now_msk: datetime):
+    """Московские 00:00 и 23:59 дня now_msk (aware) — диапазон запроса к календарю."""
+    start_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 0, 0, tzinfo=MOSCOW_ZONE)
+    end_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 23, 59, tzinfo=MOSCOW_ZONE)
+    return start_of_day_msk, end_of_day_msk
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.split()).lower()
+
+def content_hash(title: str, start: datetime, end: datetime, recurrence_id: str = "") -> str:
+    """
+    Отпечаток содержимого события, он же Event.fingerprint:
+    совпадает — значит, по встрече ничего не поменялось.
+    """
+    normalized = f"{normalize_title(title)}|{start.isoformat()}|{end.isoformat()}|{recurrence_id}"
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+@dataclass(frozen=True)
+class EventRecord:
+    """
+    Событие календаря, нормализованное один раз при загрузке.
+    start/end — "naive UTC" (как в таблице events), local_* — по Москве.
+    """
+    __slots__ = (
+        "event_id", "title", "start", "end", "local_start", "local_end",
+        "is_technical", "overlaps_planning", "recurrence_id", "content_hash",
+    )
+
+    event_id: str
+    title: str
+    start: datetime
+    end: datetime
+    local_start: datetime
+    local_end: datetime
+    is_technical: bool
+    overlaps_planning: bool
+    recurrence_id: str
+    content_hash: str
+
+    @classmethod
+    def build(cls, event_id: str, title: str, start: datetime, end: datetime,
+              recurrence_id: str = "") -> "EventRecord":
+        local_start = to_local(start)
+        local_end = to_local(end)
+        return cls(
+            event_id=event_id,
+            title=title,
+            start=start,
+            end=end,
+            local_start=local_start,
+            local_end=local_end,
+            is_technical=detect_if_technical(title),
+            overlaps_planning=is_overlap_with_support_planning(local_start, local_end),
+            recurrence_id=recurrence_id,
+            content_hash=content_hash(title, start, end, recurrence_id),
+        )
@@ -0,0 +1,120 @@
+import logging
+from datetime import date, timedelta
+
+from bot.config import BotConfig
+from bot.db import Database
+from bot.event_record import SUPPORT_PLANNING_WINDOWS, day_start_utc
+from bot.models.employees import Employee
+from bot.models.events import Event
+
+logger = logging.getLogger(__name__)
+
+MINUTES_IN_DAY = 24 * 60
+
+def minutes_mask(start_min: int, end_min: int) -> int:
+    """Битовая маска минут дня [start_min, end_min): бит i = минута i."""
+    start_min = max(0, start_min)
+    end_min = min(MINUTES_IN_DAY, end_min)
+    if end_min <= start_min:
+        return 0
+    return ((1 << (end_min - start_min)) - 1) << start_min
+
+def iter_runs(mask: int):
+    """Отдаёт непрерывные отрезки единичных битов как (start_min, end_min)."""
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        shifted = mask >> start
+        length = (shifted ^ (shifted + 1)).bit_length() - 1
+        yield start, start + length
+        mask &= ~(((1 << length) - 1) << start)
+
+class FreeSlotFinder:
+    """
+    Свободные окна сотрудников на день.
+
+    День каждого сотрудника — целое число на 1440 бит (минута = бит),
+    так что объединение/вычитание интервалов для всего состава — это
+    несколько побитовых операций над большими int, без циклов по минутам.
+    Маски кэшируются по дате до invalidate().
+    """
+    _cache = {}  # date -> (base_mask, {name: free_mask})
+
+    @classmethod
+    def invalidate(cls):
+        if cls._cache:
+            logger.debug("FreeSlotFinder cache invalidated (%d days).", len(cls._cache))
+        cls._cache.clear()
+
+    @classmethod
+    def day_masks(cls, day: date):
+        cached = cls._cache.get(day)
+        if cached is not None:
+            return cached
+
+        start_utc = day_start_utc(day)
+        end_utc = day_start_utc(day + timedelta(days=1))
+
+        base = minutes_mask(BotConfig.WORK_DAY_START_HOUR * 60, BotConfig.WORK_DAY_END_HOUR * 60)
+        planning = SUPPORT_PLANNING_WINDOWS.get(day.weekday())
+        if planning:
+            base &= ~minutes_mask(*planning)
+
+        db_sess = Database.get_session()
+        try:
+            employees = db_sess.query(Employee.user_id, Employee.username).all()
+            rows = db_sess.query(
+                Event.start_time, Event.end_time, Event.taken_by, Event.taken_by_user_id
+            ).filter(
+                Event.start_time < end_utc,
+                Event.end_time > start_utc,
+                Event.is_taken.is_(True),
+                Event.taken_by_user_id.isnot(None)
+            ).all()
+        finally:
+            db_sess.close()
+
+        busy = {}
+        names = {}
+        for row in rows:
+            start_min = int((row.start_time - start_utc).total_seconds() // 60)
+            end_min = int((row.end_time - start_utc).total_seconds() // 60)
+            busy[row.taken_by_user_id] = busy.get(row.taken_by_user_id, 0) | minutes_mask(start_min, end_min)
+            names[row.taken_by_user_id] = row.taken_by
+
+        free = {}
+        for emp in employees:
+            username = emp.username or names.get(emp.user_id)
+            # "user_id_…" — ключ taken_by для пользователя без username, упоминанием он не является
+            if username and not username.startswith("user_id_"):
+                name = f"@{username}"
+            else:
+                name = emp.user_id
+            free[name] = base & ~busy.get(emp.user_id, 0)
+
+        cls._cache[day] = (base, free)
+        return base, free
+
+    @classmethod
+    def find(cls, day: date, duration_min: int):
+        """
+        Возвращает окна, где свободен хотя бы один сотрудник:
+        [(start_min, end_min, [имена свободных не меньше duration_min]), ...]
+        """
+        _base, free = cls.day_masks(day)
+
+        any_free = 0
+        for mask in free.values():
+            any_free |= mask
+
+        slots = []
+        for start, end in iter_runs(any_free):
+            if end - start < duration_min:
+                continue
+            window = minutes_mask(start, end)
+            who = [
+                name for name, mask in free.items()
+                if any(e - s >= duration_min for s, e in iter_runs(mask & window))
+            ]
+            if who:
+                slots.append((start, end, sorted(who)))
+        return slots
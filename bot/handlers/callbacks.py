@@ -1,17 +1,21 @@
 import logging
 from aiogram import Router
-from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, User
+from sqlalchemy import select, update
 
 from bot.db import Database
 from bot.models.events import Event
 from bot.models.employees import Employee
-import pytz
+from bot.reminders import ReminderScheduler
+from bot.conflicts import ConflictDetector
+from bot.free_slots import FreeSlotFinder
+from bot.meeting_lists import MeetingLists
+from bot.stats import StatsRollup
+from bot.event_record import is_overlap_with_support_planning, to_local
 
 logger = logging.getLogger(__name__)
 router = Router()
 
-MOSCOW_TZ = pytz.timezone("Europe/Moscow")
-
 async def is_employee_by_callback(callback: CallbackQuery) -> bool:
     """
     Проверяем, есть ли callback.from_user.id (числовой) в employees.user_id.
@@ -27,6 +31,40 @@ async def is_employee_by_callback(callback: CallbackQuery) -> bool:
     finally:
         db_sess.close()
 
+def taken_by_name(user: User) -> str:
+    """
+    Имя, под которым встреча записывается в events.taken_by.
+    """
+    if user.username:
+        return user.username.lower()
+    return f"user_id_{user.id}"
+
+def latest_instance(event_id: str):
+    """
+    id строки, к которой относится кнопка с event_id. У повторяющейся
+    встречи UID общий, а в events по строке на каждый день — берём
+    последнее вхождение, т.е. то, по которому кнопка и была отправлена.
+    """
+    return (
+        select(Event.id)
+        .where(Event.event_id == event_id)
+        .order_by(Event.start_time.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+def take_statement(event_id: str, taken_by: str, taken_by_user_id: str):
+    """
+    Условный UPDATE взятия встречи: строку получает только тот, кто первым
+    сменил is_taken. Возвращает is_technical, если взятие удалось.
+    """
+    return (
+        update(Event)
+        .where(Event.id == latest_instance(event_id), Event.is_taken.isnot(True))
+        .values(is_taken=True, taken_by=taken_by, taken_by_user_id=taken_by_user_id, reminded_at=None)
+        .returning(Event.is_technical)
+    )
+
 @router.callback_query(lambda c: c.data and c.data.startswith("take:"))
 async def handle_take_meeting(callback: CallbackQuery):
     logger.debug("User %s tries to TAKE meeting, data=%s", callback.from_user.username, callback.data)
@@ -37,50 +75,63 @@ async def handle_take_meeting(callback: CallbackQuery):
         return
 
     event_id = callback.data.split(":")[1]
+    taken_by = taken_by_name(callback.from_user)
+    markup = None
+    reminder = None
+    text_is_alert = False
+
+    # Транзакция короткая: сессия закрывается до любых вызовов Telegram API.
     db_sess = Database.get_session()
     try:
-        event = db_sess.query(Event).filter(Event.event_id == event_id).first()
+        event = db_sess.query(Event).filter(Event.id == latest_instance(event_id)).first()
         if not event:
-            await callback.message.edit_text("Встреча не найдена в базе.")
+            text = "Встреча не найдена в базе."
         else:
-            if event.is_taken:
-                await callback.message.edit_text(f"Встреча уже взята @{event.taken_by}.")
+            # В базе время хранится как "naive UTC"
+            start_msk = to_local(event.start_time)
+            end_msk = to_local(event.end_time)
+            title = event.title
+            start_time, end_time = event.start_time, event.end_time
+            conflicts = ConflictDetector.find_conflicts(taken_by, start_time, end_time, exclude=event_id)
+
+            # Если пересекается с планёркой, не даём взять:
+            # (На всякий случай повторная проверка, вдруг кнопка появилась)
+            if is_overlap_with_support_planning(start_msk, end_msk):
+                text = (
+                    "‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки,\n"
+                    "нельзя взять эту встречу!"
+                )
+            elif conflicts:
+                text = (
+                    "‼️ Встреча пересекается с другой вашей встречей:\n"
+                    f"{conflicts[0][1][:100]}\n"
+                    "нельзя взять эту встречу!"
+                )
+                # Сообщение с кнопкой не затираем — встречу может взять кто-то другой
+                text_is_alert = True
             else:
-                # Если пересекается с планёркой, не даём взять:
-                # (На всякий случай повторная проверка, вдруг кнопка появилась)
-                start_msk = event.start_time.astimezone(MOSCOW_TZ)
-                end_msk = event.end_time.astimezone(MOSCOW_TZ)
-
-                # Простая локальная функция
-                def is_overlap_with_support_planning(local_start, local_end):
-                    def intervals_overlap(s1, e1, s2, e2):
-                        return s1 < e2 and s2 < e1
-                    wd = local_start.weekday()
-                    # Понедельник=0 (15:00-16:00), Пятница=4 (15:00-17:00)
-                    if wd == 0:
-                        plan_s = local_start.replace(hour=15, minute=0, second=0)
-                        plan_e = local_start.replace(hour=16, minute=0, second=0)
-                        return intervals_overlap(local_start, local_end, plan_s, plan_e)
-                    elif wd == 4:
-                        plan_s = local_start.replace(hour=15, minute=0, second=0)
-                        plan_e = local_start.replace(hour=17, minute=0, second=0)
-                        return intervals_overlap(local_start, local_end, plan_s, plan_e)
-                    return False
-
-                if is_overlap_with_support_planning(start_msk, end_msk):
-                    await callback.message.edit_text(
-                        "‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки,\n"
-                        "нельзя взять эту встречу!"
-                    )
-                else:
-                    event.is_taken = True
-                    event.taken_by = (
-                        callback.from_user.username.lower()
-                        if callback.from_user.username
-                        else f"user_id_{callback.from_user.id}"
-                    )
-                    db_sess.commit()
+                # Условный UPDATE: при одновременных нажатиях строку
+                # получает только тот, кто первым сменил is_taken.
+                won = db_sess.execute(
+                    take_statement(event_id, taken_by, str(callback.from_user.id))
+                ).first()
+                if won is not None:
+                    StatsRollup.add(db_sess, start_time, taken_by, won.is_technical, 1)
+                db_sess.commit()
 
+                if won is None:
+                    winner = db_sess.query(Event.taken_by).filter(Event.id == latest_instance(event_id)).scalar()
+                    if winner:
+                        text = f"Встреча уже взята @{winner}."
+                    else:
+                        # Взявший успел отказаться между нашим UPDATE и этим запросом
+                        text = "Встречу только что освободили, попробуйте ещё раз."
+                        take_btn = InlineKeyboardButton(
+                            text="Взять встречу",
+                            callback_data=f"take:{event_id}"
+                        )
+                        markup = InlineKeyboardMarkup(inline_keyboard=[[take_btn]])
+                else:
                     decline_btn = InlineKeyboardButton(
                         text="Отказаться от встречи",
                         callback_data=f"decline:{event_id}"
@@ -89,17 +140,28 @@ async def handle_take_meeting(callback: CallbackQuery):
 
                     start_str = start_msk.strftime("%H:%M")
                     end_str = end_msk.strftime("%H:%M")
-
-                    await callback.message.edit_text(
-                        f"Встреча: {event.title}\n"
+                    text = (
+                        f"Встреча: {title}\n"
                         f"Время: {start_str} - {end_str}\n"
-                        f"Взял(а): @{callback.from_user.username or callback.from_user.id}",
-                        reply_markup=markup
+                        f"Взял(а): @{callback.from_user.username or callback.from_user.id}"
                     )
-        await callback.answer()
+                    reminder = (event_id, callback.from_user.id, title, start_time, end_time)
     finally:
         db_sess.close()
 
+    if text_is_alert:
+        await callback.answer(text, show_alert=True)
+        return
+
+    if reminder:
+        ConflictDetector.add(taken_by, event_id, title, start_time, end_time)
+        ReminderScheduler.schedule(*reminder)
+        FreeSlotFinder.invalidate()
+        MeetingLists.invalidate()
+
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
+
 @router.callback_query(lambda c: c.data and c.data.startswith("decline:"))
 async def handle_decline_meeting(callback: CallbackQuery):
     logger.debug("User %s tries to DECLINE meeting, data=%s", callback.from_user.username, callback.data)
@@ -110,41 +172,56 @@ async def handle_decline_meeting(callback: CallbackQuery):
         return
 
     event_id = callback.data.split(":")[1]
+    current_user_lower = taken_by_name(callback.from_user)
+    text = None
+    markup = None
+
     db_sess = Database.get_session()
     try:
-        event = db_sess.query(Event).filter(Event.event_id == event_id).first()
-        if not event:
-            await callback.message.edit_text("Встреча не найдена.")
-        else:
-            current_user_lower = (
-                callback.from_user.username.lower()
-                if callback.from_user.username
-                else f"user_id_{callback.from_user.id}"
+        # Снять встречу может только тот, на ком она записана — проверка
+        # входит в сам UPDATE, поэтому гонки с повторным взятием нет.
+        row = db_sess.execute(
+            update(Event)
+            .where(
+                Event.id == latest_instance(event_id),
+                Event.is_taken.is_(True),
+                Event.taken_by == current_user_lower
             )
-            if event.is_taken and event.taken_by == current_user_lower:
-                event.is_taken = False
-                event.taken_by = None
-                db_sess.commit()
-
-                take_btn = InlineKeyboardButton(
-                    text="Взять встречу",
-                    callback_data=f"take:{event_id}"
-                )
-                markup = InlineKeyboardMarkup(inline_keyboard=[[take_btn]])
-
-                start_str = event.start_time.astimezone(MOSCOW_TZ).strftime("%H:%M")
-                end_str = event.end_time.astimezone(MOSCOW_TZ).strftime("%H:%M")
-
-                await callback.message.edit_text(
-                    f"Встреча: {event.title}\n"
-                    f"Время: {start_str} - {end_str}\n"
-                    "Встреча снова доступна для взятия.",
-                    reply_markup=markup
-                )
-            else:
-                # Если пользователь не ответственен — показываем alert вместо затирания сообщения.
-                await callback.answer("Вы не являетесь ответственным за эту встречу.", show_alert=True)
-                return
-        await callback.answer()
+            .values(is_taken=False, taken_by=None, taken_by_user_id=None, reminded_at=None)
+            .returning(Event.title, Event.start_time, Event.end_time, Event.is_technical)
+        ).first()
+        if row is not None:
+            StatsRollup.add(db_sess, row.start_time, current_user_lower, row.is_technical, -1)
+        db_sess.commit()
+
+        if row is not None:
+            ReminderScheduler.cancel(event_id)
+            ConflictDetector.remove(event_id)
+            FreeSlotFinder.invalidate()
+            MeetingLists.invalidate()
+
+            take_btn = InlineKeyboardButton(
+                text="Взять встречу",
+                callback_data=f"take:{event_id}"
+            )
+            markup = InlineKeyboardMarkup(inline_keyboard=[[take_btn]])
+
+            start_str = to_local(row.start_time).strftime("%H:%M")
+            end_str = to_local(row.end_time).strftime("%H:%M")
+            text = (
+                f"Встреча: {row.title}\n"
+                f"Время: {start_str} - {end_str}\n"
+                "Встреча снова доступна для взятия."
+            )
+        elif db_sess.query(Event.id).filter(Event.event_id == event_id).first() is None:
+            text = "Встреча не найдена."
     finally:
         db_sess.close()
+
+    if text is None:
+        # Если пользователь не ответственен — показываем alert вместо затирания сообщения.
+        await callback.answer("Вы не являетесь ответственным за эту встречу.", show_alert=True)
+        return
+
+    await callback.message.edit_text(text, reply_markup=markup)
+    await callback.answer()
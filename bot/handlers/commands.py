@@ -1,10 +1,18 @@
 import logging
+from datetime import date, timedelta
 from aiogram import Router
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import BufferedInputFile, Message
 
+from bot.config import BotConfig
 from bot.db import Database
+from bot.event_record import moscow_now
 from bot.models.employees import Employee
+from bot.free_slots import FreeSlotFinder
+from bot.handlers.callbacks import taken_by_name
+from bot.meeting_lists import MeetingLists
+from bot.stats import StatsRollup
+from bot.watchdog import HandlerTimingMiddleware, LoopWatchdog, Profiler
 
 logger = logging.getLogger(__name__)
 router = Router()
@@ -21,13 +29,21 @@ async def is_employee(message: Message) -> bool:
     finally:
         db_sess.close()
 
+def is_admin(message: Message) -> bool:
+    return bool(message.from_user) and str(message.from_user.id) in BotConfig.ADMIN_USER_IDS
+
 @router.message(Command(commands=["start"]))
 async def cmd_start(message: Message):
     await message.answer(
         "Привет! Я бот для работы с календарём.\n"
         "Команды:\n"
-        "/add <user_id> — добавить сотрудника\n"
-        "/rm <user_id> — удалить сотрудника\n"
+        "/add &lt;user_id&gt; — добавить сотрудника\n"
+        "/rm &lt;user_id&gt; — удалить сотрудника\n"
+        "/free &lt;ДД.ММ[.ГГГГ]&gt; [минуты] — свободные окна техподдержки\n"
+        "/report [месяцев] — статистика взятых встреч за несколько месяцев\n"
+        "/today — встречи на сегодня\n"
+        "/week — встречи на неделю\n"
+        "/my — ваши взятые встречи\n"
     )
 
 @router.message(Command(commands=["add"]))
@@ -38,7 +54,7 @@ async def cmd_add(message: Message):
 
     args = message.text.strip().split()
     if len(args) < 2:
-        await message.answer("Укажите Telegram user_id: /add <user_id>")
+        await message.answer("Укажите Telegram user_id: /add &lt;user_id&gt;")
         return
 
     numeric_id_str = args[1]
@@ -52,6 +68,7 @@ async def cmd_add(message: Message):
             new_emp = Employee(user_id=numeric_id_str, username="")
             db_sess.add(new_emp)
             db_sess.commit()
+            FreeSlotFinder.invalidate()
             await message.answer(f"Сотрудник c user_id={numeric_id_str} добавлен!")
     finally:
         db_sess.close()
@@ -64,7 +81,7 @@ async def cmd_remove(message: Message):
 
     args = message.text.strip().split()
     if len(args) < 2:
-        await message.answer("Укажите Telegram user_id: /rm <user_id>")
+        await message.answer("Укажите Telegram user_id: /rm &lt;user_id&gt;")
         return
 
     numeric_id_str = args[1]
@@ -77,6 +94,178 @@ async def cmd_remove(message: Message):
         else:
             db_sess.delete(emp)
             db_sess.commit()
+            FreeSlotFinder.invalidate()
             await message.answer(f"Сотрудник с user_id={numeric_id_str} удалён!")
     finally:
         db_sess.close()
+
+def parse_day(value: str, today):
+    """
+    Разбирает дату для /free: "сегодня", "завтра", ДД.ММ или ДД.ММ.ГГГГ.
+    Возвращает date или None.
+    """
+    value = value.lower()
+    if value in ("сегодня", "today"):
+        return today
+    if value in ("завтра", "tomorrow"):
+        return today + timedelta(days=1)
+    # Без года strptime подставил бы 1900, и 29.02 не разобралось бы —
+    # поэтому день и месяц разбираем сами и сразу берём текущий год
+    parts = value.split(".")
+    if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts):
+        return None
+    year = int(parts[2]) if len(parts) == 3 else today.year
+    try:
+        return date(year, int(parts[1]), int(parts[0]))
+    except ValueError:
+        return None
+
+@router.message(Command(commands=["free"]))
+async def cmd_free(message: Message):
+    if not await is_employee(message):
+        await message.answer("Вы не являетесь сотрудником. Доступ запрещен.")
+        return
+
+    args = message.text.strip().split()
+    if len(args) < 2:
+        await message.answer("Укажите дату: /free &lt;ДД.ММ[.ГГГГ]&gt; [минуты]")
+        return
+
+    day = parse_day(args[1], moscow_now().date())
+    if day is None:
+        await message.answer("Не удалось разобрать дату. Пример: /free 21.10 60")
+        return
+
+    duration = 60
+    if len(args) > 2:
+        if not args[2].isdigit() or int(args[2]) == 0:
+            await message.answer("Длительность указывается в минутах, например: /free 21.10 90")
+            return
+        duration = int(args[2])
+
+    slots = FreeSlotFinder.find(day, duration)
+    day_str = day.strftime("%d.%m.%Y")
+    if not slots:
+        await message.answer(f"На {day_str} свободных окон от {duration} мин. нет.")
+        return
+
+    msg_lines = [f"Свободные окна на {day_str} (от {duration} мин.):"]
+    for start, end, who in slots:
+        names = ", ".join(who)
+        msg_lines.append(f"{start // 60:02d}:{start % 60:02d} - {end // 60:02d}:{end % 60:02d}: {names}")
+    await message.answer("\n".join(msg_lines))
+
+def year_earlier(day):
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        # 29 февраля
+        return day.replace(year=day.year - 1, day=28)
+
+@router.message(Command(commands=["report"]))
+async def cmd_report(message: Message):
+    if not await is_employee(message):
+        await message.answer("Вы не являетесь сотрудником. Доступ запрещен.")
+        return
+
+    args = message.text.strip().split()
+    months = 3
+    if len(args) > 1:
+        if not args[1].isdigit() or not 1 <= int(args[1]) <= 36:
+            await message.answer("Укажите число месяцев от 1 до 36: /report [месяцев]")
+            return
+        months = int(args[1])
+
+    today = moscow_now().date()
+    month_index = today.year * 12 + today.month - 1 - (months - 1)
+    first_day = today.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+    rows = StatsRollup.totals(first_day, today)
+    prev_rows = StatsRollup.totals(year_earlier(first_day), year_earlier(today))
+
+    total = sum(r[2] for r in rows)
+    total_tech = sum(r[3] for r in rows)
+    prev_total = sum(r[2] for r in prev_rows)
+
+    msg_lines = [
+        f"Статистика с {first_day.strftime('%d.%m.%Y')} по {today.strftime('%d.%m.%Y')}:",
+        f"Всего взятых встреч: {total}, из них тех.встреч: {total_tech}",
+        f"Год назад за тот же период: {prev_total}"
+    ]
+
+    current_month = None
+    for month, user, count, tech_count in rows:
+        if not count:
+            continue
+        if month != current_month:
+            current_month = month
+            msg_lines.append(f"\n{month.strftime('%m.%Y')}:")
+        msg_lines.append(f"{user} — {count} встреч(и), из них тех.встреч: {tech_count}")
+
+    await message.answer("\n".join(msg_lines))
+
+@router.message(Command(commands=["latency"]))
+async def cmd_latency(message: Message):
+    if not is_admin(message):
+        await message.answer("Команда доступна только администраторам.")
+        return
+
+    msg_lines = [
+        f"Задержка event loop: сейчас {LoopWatchdog.last_lag * 1000:.0f} мс, "
+        f"максимум {LoopWatchdog.max_lag * 1000:.0f} мс, блокировок: {LoopWatchdog.stalls}",
+        "\nОбработчики (вызовов / среднее / максимум):"
+    ]
+    for name, (count, total, worst) in sorted(HandlerTimingMiddleware.stats.items()):
+        msg_lines.append(f"{name}: {count} / {total / count * 1000:.0f} мс / {worst * 1000:.0f} мс")
+    await message.answer("\n".join(msg_lines))
+
+@router.message(Command(commands=["profile"]))
+async def cmd_profile(message: Message):
+    if not is_admin(message):
+        await message.answer("Команда доступна только администраторам.")
+        return
+    if Profiler.is_running():
+        await message.answer("Профилирование уже идёт.")
+        return
+
+    args = message.text.strip().split()
+    seconds = 10
+    if len(args) > 1:
+        if not args[1].isdigit() or not 1 <= int(args[1]) <= 120:
+            await message.answer("Укажите длительность от 1 до 120 секунд: /profile [секунд]")
+            return
+        seconds = int(args[1])
+
+    async def send_report(report: str):
+        await message.answer_document(
+            BufferedInputFile(report.encode(), filename="profile.txt"),
+            caption=f"cProfile за {seconds} сек."
+        )
+
+    # Профилирование идёт в фоне: обработчик не ждёт его и не портит /latency
+    Profiler.start(seconds, send_report)
+    await message.answer(f"Профилирую {seconds} сек, отчёт пришлю по готовности.")
+
+@router.message(Command(commands=["today"]))
+async def cmd_today(message: Message):
+    if not await is_employee(message):
+        await message.answer("Вы не являетесь сотрудником. Доступ запрещен.")
+        return
+
+    await message.answer(MeetingLists.today(moscow_now().date()))
+
+@router.message(Command(commands=["week"]))
+async def cmd_week(message: Message):
+    if not await is_employee(message):
+        await message.answer("Вы не являетесь сотрудником. Доступ запрещен.")
+        return
+
+    await message.answer(await MeetingLists.week(moscow_now().date()))
+
+@router.message(Command(commands=["my"]))
+async def cmd_my(message: Message):
+    if not await is_employee(message):
+        await message.answer("Вы не являетесь сотрудником. Доступ запрещен.")
+        return
+
+    await message.answer(MeetingLists.my(moscow_now().date(), taken_by_name(message.from_user)))
@@ -1,7 +1,6 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-import pytz
 
 from aiogram import Bot, Dispatcher
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
@@ -10,72 +9,30 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from bot.config import BotConfig
 from bot.encryption import EncryptionManager
 from bot.db import Database
-from bot.caldav_client import CalDavClient
+from bot.calendar_service import CalendarService
+from bot.event_record import (
+    MOSCOW_ZONE, day_start_utc, is_excluded_planerka, moscow_now, to_local, to_utc, utc_now
+)
+from bot.changes import ChangeKind, detect_changes
 from bot.models.events import Event
+from bot.models.calendar_snapshot import CalendarSnapshot
+from bot.reminders import ReminderScheduler
+from bot.conflicts import ConflictDetector
+from bot.free_slots import FreeSlotFinder
+from bot.meeting_lists import MeetingLists
+from bot.stats import StatsRollup
+from bot.watchdog import HandlerTimingMiddleware, LoopWatchdog
 
 from bot.handlers.commands import router as commands_router
 from bot.handlers.callbacks import router as callbacks_router
 
 logger = logging.getLogger(__name__)
 
-MOSCOW_TZ = pytz.timezone("Europe/Moscow")
-
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
 
-TOLERANCE_SECONDS = 240  # 4 минуты
-
-def times_differ_enough(dt_old: datetime, dt_new: datetime) -> bool:
-    diff_sec = abs((dt_new - dt_old).total_seconds())
-    return diff_sec >= TOLERANCE_SECONDS
-
-def detect_if_technical(title: str) -> bool:
-    keywords = [
-        "тех.встреча",
-        "тех. встреча",
-        "техвстреча",
-        "тех встреча",
-        "технич. встреча",
-        "техничиская встреча",
-        "техническая встреча",
-        "техническая",
-        "technical meeting",
-        "тех.вкс",
-        "тех. вкс",
-        "тех.созвон",
-        "тех. созвон",
-        "тех созвон",
-        "[тех встреча]",
-        "(тех встреча)",
-        "техконсультация",
-        "тех.консультация",
-        "технические вопросы",
-    ]
-    lower_title = title.lower()
-    return any(k in lower_title for k in keywords)
-
-def is_overlap_with_support_planning(local_start: datetime, local_end: datetime) -> bool:
-    """
-    Проверяем пересечение с планёрками техподдержки:
-      - Понедельник 15:00–16:00
-      - Пятница     15:00–17:00
-    """
-    def intervals_overlap(s1, e1, s2, e2):
-        return s1 < e2 and s2 < e1
-
-    wd = local_start.weekday()  # 0=Пн, 4=Пт
-    if wd == 0:
-        plan_s = local_start.replace(hour=15, minute=0, second=0)
-        plan_e = local_start.replace(hour=16, minute=0, second=0)
-        return intervals_overlap(local_start, local_end, plan_s, plan_e)
-    elif wd == 4:
-        plan_s = local_start.replace(hour=15, minute=0, second=0)
-        plan_e = local_start.replace(hour=17, minute=0, second=0)
-        return intervals_overlap(local_start, local_end, plan_s, plan_e)
-    return False
-
 async def on_startup():
     logger.info("Bot startup initiated. Initializing Database...")
     Database.init()
@@ -84,81 +41,50 @@ def filter_today_events(raw_events, now_msk: datetime):
     today_date = now_msk.date()
     filtered = []
     for e in raw_events:
-        local_start = pytz.UTC.localize(e["start"]).astimezone(MOSCOW_TZ)
-        if local_start.date() == today_date:
+        if e.local_start.date() == today_date:
             filtered.append(e)
     return filtered
 
-def is_excluded_planerka(title: str) -> bool:
-    """
-    Проверяем, является ли событие планёркой:
-      - Если title ровно "Support планёрка"
-      - Или title ровно "Большая планерка"
-    Тогда исключаем из любых оповещений
-    """
-    lower_t = title.lower().strip()
-    return lower_t == "support планёрка" or lower_t == "большая планерка"
-
-async def morning_today_events(bot: Bot):
-    logger.debug("morning_today_events() called.")
-    now_msk = datetime.now(MOSCOW_TZ)
-    start_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 0, 0, tzinfo=MOSCOW_TZ)
-    end_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 23, 59, tzinfo=MOSCOW_TZ)
-
-    caldav_client = CalDavClient()
-    raw_events = caldav_client.get_upcoming_events(start_of_day_msk, end_of_day_msk)
-    events = filter_today_events(raw_events, now_msk)
-
-    # Фильтруем планёрки, которые не хотим отправлять
-    events = [ev for ev in events if not is_excluded_planerka(ev["title"])]
-
-    logger.debug("Found %d events for today (morning), after exclusion.", len(events))
-    if not events:
-        msg_text = "Доброе утро!\nНа сегодня встреч нет (или только планёрки)."
-        try:
-            await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=msg_text)
-        except Exception:
-            logger.exception("Failed to send 'no events' message.")
-        return
-
-    greeting_text = f"Доброе утро!\nНа сегодня назначено {len(events)} встреч."
-    try:
-        await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=greeting_text)
-    except Exception:
-        logger.exception("Failed to send greeting message.")
+# День, за который утренняя рассылка ещё не получила свежих данных из
+# календаря: встречи этого дня досылаются, как только календарь ответит
+pending_digest_day = None
+_digest_task = None
 
+async def send_today_events(bot: Bot, events):
+    """Записывает встречи в events и отправляет по каждой сообщение с кнопкой "Взять"."""
     db_sess = Database.get_session()
     try:
         for e in events:
-            existing = db_sess.query(Event).filter(Event.event_id == e["event_id"]).first()
+            existing = db_sess.query(Event).filter(
+                Event.event_id == e.event_id, *Event.on_local_day(e.local_start.date())
+            ).first()
             if not existing:
                 new_ev = Event(
-                    event_id=e["event_id"],
-                    title=e["title"],
-                    start_time=e["start"],
-                    end_time=e["end"],
-                    is_technical=detect_if_technical(e["title"])
+                    event_id=e.event_id,
+                    title=e.title,
+                    start_time=e.start,
+                    end_time=e.end,
+                    is_technical=e.is_technical,
+                    fingerprint=e.content_hash
                 )
                 db_sess.add(new_ev)
+                MeetingLists.invalidate()
                 db_sess.commit()
 
-            local_start = pytz.UTC.localize(e["start"]).astimezone(MOSCOW_TZ)
-            local_end = pytz.UTC.localize(e["end"]).astimezone(MOSCOW_TZ)
-            start_str = local_start.strftime("%H:%M")
-            end_str = local_end.strftime("%H:%M")
+            start_str = e.local_start.strftime("%H:%M")
+            end_str = e.local_end.strftime("%H:%M")
 
             text = (
                 f"Встреча на сегодня!\n"
-                f"{e['title']}\n"
+                f"{e.title}\n"
                 f"{start_str} - {end_str}"
             )
 
             # Если тех.встреча:
-            if detect_if_technical(e["title"]):
+            if e.is_technical:
                 text += "\n‼️ Внимание это тех.встреча!!"
 
-            overlap = is_overlap_with_support_planning(local_start, local_end)
-            if overlap:
+            if e.overlaps_planning:
                 text += "\n‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки, перенесите встречу!!!"
                 # Не показываем кнопку "Взять", т.к. пересекается
                 markup = None
@@ -166,7 +92,7 @@ async def morning_today_events(bot: Bot):
                 # Добавляем кнопку
                 take_btn = InlineKeyboardButton(
                     text="Взять встречу",
-                    callback_data=f"take:{e['event_id']}"
+                    callback_data=f"take:{e.event_id}"
                 )
                 markup = InlineKeyboardMarkup(inline_keyboard=[[take_btn]])
 
@@ -182,63 +108,251 @@ async def morning_today_events(bot: Bot):
     finally:
         db_sess.close()
 
+def digest_events(raw_events, now_msk: datetime):
+    # Фильтруем планёрки, которые не хотим отправлять
+    return [ev for ev in filter_today_events(raw_events, now_msk) if not is_excluded_planerka(ev.title)]
+
+async def prefetch_today_events():
+    """Заранее обновляет снимок календаря, чтобы утренней рассылке было на что опереться."""
+    logger.debug("prefetch_today_events() called.")
+    try:
+        await CalendarService.refresh_today(moscow_now())
+    except Exception:
+        logger.warning("Calendar prefetch failed, the digest will use the last snapshot.")
+
+async def morning_today_events(bot: Bot):
+    global pending_digest_day, _digest_task
+    logger.debug("morning_today_events() called.")
+    now_msk = moscow_now()
+
+    # Медленный календарь не должен задерживать рассылку: ждём ограниченное
+    # время, дальше работаем по последнему удачному снимку.
+    raw_events, fetched_at, fresh = await CalendarService.get_today_events(
+        now_msk, wait=BotConfig.CALDAV_DIGEST_WAIT_SECONDS
+    )
+    await send_morning_digest(bot, raw_events, fetched_at, fresh, now_msk)
+
+    if not fresh:
+        # Обновление продолжается в фоне — дошлём то, чего не было в снимке.
+        # Только после рассылки: её встречи к этому моменту уже лежат в events.
+        pending_digest_day = now_msk.date()
+        _digest_task = asyncio.create_task(send_pending_digest_when_fresh(bot, now_msk))
+
+async def send_morning_digest(bot: Bot, raw_events, fetched_at, fresh: bool, now_msk: datetime):
+    if raw_events is None:
+        msg_text = "Доброе утро!\nКалендарь сейчас недоступен, список встреч пришлю, как только он ответит."
+        try:
+            await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=msg_text)
+        except Exception:
+            logger.exception("Failed to send 'calendar unavailable' message.")
+        return
+    events = digest_events(raw_events, now_msk)
+
+    logger.debug("Found %d events for today (morning), after exclusion.", len(events))
+    if not events:
+        msg_text = "Доброе утро!\nНа сегодня встреч нет (или только планёрки)."
+        try:
+            await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=msg_text)
+        except Exception:
+            logger.exception("Failed to send 'no events' message.")
+        return
+
+    greeting_text = f"Доброе утро!\nНа сегодня назначено {len(events)} встреч."
+    if not fresh:
+        fetched_msk = to_local(fetched_at)
+        greeting_text += f"\n(Календарь не ответил, данные на {fetched_msk.strftime('%d.%m %H:%M')})"
+    try:
+        await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=greeting_text)
+    except Exception:
+        logger.exception("Failed to send greeting message.")
+
+    await send_today_events(bot, events)
+
+async def send_pending_digest_when_fresh(bot: Bot, now_msk: datetime):
+    """
+    Ждёт фоновое обновление календаря после утренней рассылки по снимку
+    (или без данных). Если и оно не удалось, встречи дошлёт
+    check_for_updates при первом удачном запросе.
+    """
+    try:
+        raw_events = await CalendarService.refresh_today(now_msk)
+    except Exception:
+        logger.warning("Calendar is still unavailable, the digest stays pending.")
+        return
+    await send_pending_digest(bot, raw_events, now_msk)
+
+async def send_pending_digest(bot: Bot, raw_events, now_msk: datetime):
+    """
+    Досылает утреннюю рассылку по свежим данным: встречи, которых ещё нет
+    в events, уходят обычными сообщениями "Встреча на сегодня", а не как
+    назначенные день в день.
+    """
+    global pending_digest_day
+    if pending_digest_day != now_msk.date():
+        return
+    pending_digest_day = None
+
+    events = digest_events(raw_events, now_msk)
+    db_sess = Database.get_session()
+    try:
+        known_ids = {
+            row.event_id
+            for row in db_sess.query(Event.event_id).filter(
+                Event.event_id.in_([ev.event_id for ev in events]),
+                *Event.on_local_day(now_msk.date())
+            ).all()
+        }
+    finally:
+        db_sess.close()
+    missing = [ev for ev in events if ev.event_id not in known_ids]
+    logger.info("Calendar is back, %d events were missing from the morning digest.", len(missing))
+    if not missing:
+        return
+
+    msg_text = f"Календарь снова доступен. Встречи на сегодня, которых не было в утреннем списке: {len(missing)}."
+    try:
+        await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=msg_text)
+    except Exception:
+        logger.exception("Failed to send delayed digest greeting.")
+    await send_today_events(bot, missing)
+
+async def apply_event_changes(bot: Bot, db_sess, existing: Event, e, changes):
+    """
+    Применяет к строке events изменения из календаря (changes: ChangeKind -> EventChange)
+    и отправляет одно оповещение по встрече.
+    """
+    moved = ChangeKind.MOVED in changes
+    renamed = changes.get(ChangeKind.RENAMED)
+    reclassified = changes.get(ChangeKind.RECLASSIFIED)
+
+    if existing.is_taken and existing.taken_by:
+        # Свёртка статистики: перенос на другой день или смена тех.флага
+        old_key = (StatsRollup.local_day(existing.start_time), bool(existing.is_technical))
+        new_key = (StatsRollup.local_day(e.start) if moved else old_key[0], e.is_technical)
+        if old_key != new_key:
+            StatsRollup.add(db_sess, existing.start_time, existing.taken_by, existing.is_technical, -1)
+            StatsRollup.add(db_sess, e.start if moved else existing.start_time, existing.taken_by, e.is_technical, 1)
+
+    if moved:
+        existing.start_time = e.start
+        existing.end_time = e.end
+        # Новое время — новое напоминание
+        existing.reminded_at = None
+    existing.title = e.title
+    existing.is_technical = e.is_technical
+    db_sess.commit()
+    MeetingLists.invalidate()
+
+    if existing.is_taken and existing.taken_by_user_id and existing.reminded_at is None:
+        ReminderScheduler.schedule(
+            existing.event_id, existing.taken_by_user_id,
+            existing.title, existing.start_time, existing.end_time
+        )
+    taken_by, conflicts = ConflictDetector.move(
+        existing.event_id, existing.title, existing.start_time, existing.end_time
+    )
+    if moved:
+        FreeSlotFinder.invalidate()
+        text = (
+            f"Встреча перенесена:\n{e.title}\n"
+            f"Новое время: {e.local_start.strftime('%H:%M')} - {e.local_end.strftime('%H:%M')}"
+        )
+    else:
+        local_start = to_local(existing.start_time)
+        local_end = to_local(existing.end_time)
+        text = (
+            f"Встреча изменена:\n{e.title}\n"
+            f"{local_start.strftime('%H:%M')} - {local_end.strftime('%H:%M')}"
+        )
+    if renamed:
+        text += f"\nПрежнее название: {renamed.old}"
+    if reclassified:
+        if reclassified.new:
+            text += "\n‼️ Внимание это тех.встреча!!"
+        else:
+            text += "\nВстреча больше не тех.встреча."
+    elif existing.is_technical:
+        text += "\n(Тех.встреча)"
+    if moved and e.overlaps_planning:
+        text += "\n‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки, перенесите встречу!!!"
+    if moved and conflicts:
+        text += f"\n‼️ После переноса у @{taken_by} пересечение с: {conflicts[0][1]}"
+
+    try:
+        await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=text)
+    except Exception:
+        logger.exception("Failed to send changed event (%s).", ", ".join(k.value for k in changes))
+
 async def check_for_updates(bot: Bot):
     logger.debug("check_for_updates() called.")
-    now_msk = datetime.now(MOSCOW_TZ)
+    now_msk = moscow_now()
     if not (7 <= now_msk.hour < 20):
         logger.info("Outside of 7:00-20:00 range, skip updates.")
         return
 
-    start_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 0, 0, tzinfo=MOSCOW_TZ)
-    end_of_day_msk = datetime(now_msk.year, now_msk.month, now_msk.day, 23, 59, tzinfo=MOSCOW_TZ)
-
-    caldav_client = CalDavClient()
-    raw_events = caldav_client.get_upcoming_events(start_of_day_msk, end_of_day_msk)
+    # Сравнивать с базой можно только свежие данные: по старому снимку
+    # появились бы ложные "отмены" и "переносы".
+    try:
+        raw_events = await CalendarService.refresh_today(now_msk)
+    except Exception:
+        logger.exception("Calendar is unavailable, skip updates.")
+        return
+    # Утренняя рассылка ждёт календарь — сначала дошлём её,
+    # иначе её встречи ушли бы как назначенные день в день
+    await send_pending_digest(bot, raw_events, now_msk)
     events_today = filter_today_events(raw_events, now_msk)
 
     # Сразу отсекаем "Support планёрка" и "Большая планерка"
-    events_today = [ev for ev in events_today if not is_excluded_planerka(ev["title"])]
+    events_today = [ev for ev in events_today if not is_excluded_planerka(ev.title)]
 
     logger.debug("events_today after filter & exclusion: %d", len(events_today))
 
-    current_ids = [ev["event_id"] for ev in events_today]
+    current_ids = {ev.event_id for ev in events_today}
     db_sess = Database.get_session()
     try:
+        # Все уже известные встречи дня — одним запросом. Только строки
+        # сегодняшнего дня: иначе вхождение повторяющейся встречи совпало
+        # бы со строкой прошлого дня и каждый день считалось бы переносом.
+        known = {
+            ev.event_id: ev
+            for ev in db_sess.query(Event).filter(
+                Event.event_id.in_(current_ids), *Event.on_local_day(now_msk.date())
+            ).all()
+        }
         for e in events_today:
-            existing = db_sess.query(Event).filter(Event.event_id == e["event_id"]).first()
+            existing = known.get(e.event_id)
             if not existing:
-                local_end = pytz.UTC.localize(e["end"]).astimezone(MOSCOW_TZ)
-                if local_end > now_msk:
+                if e.local_end > now_msk:
                     new_ev = Event(
-                        event_id=e["event_id"],
-                        title=e["title"],
-                        start_time=e["start"],
-                        end_time=e["end"],
-                        is_technical=detect_if_technical(e["title"])
+                        event_id=e.event_id,
+                        title=e.title,
+                        start_time=e.start,
+                        end_time=e.end,
+                        is_technical=e.is_technical,
+                        fingerprint=e.content_hash
                     )
                     db_sess.add(new_ev)
+                    MeetingLists.invalidate()
                     db_sess.commit()
 
-                    local_start = pytz.UTC.localize(e["start"]).astimezone(MOSCOW_TZ)
-                    start_str = local_start.strftime("%H:%M")
-                    end_str = local_end.strftime("%H:%M")
+                    start_str = e.local_start.strftime("%H:%M")
+                    end_str = e.local_end.strftime("%H:%M")
 
                     text = (
                         "‼️‼️ ВНИМАНИЕ! Встреча назначена день в день!\n"
-                        f"{e['title']}\n"
+                        f"{e.title}\n"
                         f"{start_str} - {end_str}"
                     )
-                    if detect_if_technical(e["title"]):
+                    if e.is_technical:
                         text += "\n‼️ Внимание это тех.встреча!!"
 
-                    overlap = is_overlap_with_support_planning(local_start, local_end)
-                    if overlap:
+                    if e.overlaps_planning:
                         text += "\n‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки, перенесите встречу!!!"
                         markup = None
                     else:
                         take_btn = InlineKeyboardButton(
                             text="Взять встречу",
-                            callback_data=f"take:{e['event_id']}"
+                            callback_data=f"take:{e.event_id}"
                         )
                         markup = InlineKeyboardMarkup(inline_keyboard=[[take_btn]])
 
@@ -250,51 +364,40 @@ async def check_for_updates(bot: Bot):
                     except Exception:
                         logger.exception("Failed to send day-in-day event.")
             else:
-                old_start = existing.start_time
-                old_end = existing.end_time
-                new_start = e["start"]
-                new_end = e["end"]
-
-                start_changed = times_differ_enough(old_start, new_start)
-                end_changed   = times_differ_enough(old_end, new_end)
-
-                if start_changed or end_changed:
-                    existing.start_time = new_start
-                    existing.end_time = new_end
-                    existing.title = e["title"]
+                # Отпечаток совпал — встреча не менялась, поля не сравниваем
+                if existing.fingerprint == e.content_hash:
+                    continue
+
+                changes = {c.kind: c for c in detect_changes(existing, e)}
+                existing.fingerprint = e.content_hash
+                if not changes:
+                    # Сдвиг меньше TOLERANCE_SECONDS: оповещать не о чем, но
+                    # время в строке должно совпадать с новым отпечатком
+                    existing.start_time = e.start
+                    existing.end_time = e.end
                     db_sess.commit()
+                    continue
 
-                    local_start = pytz.UTC.localize(new_start).astimezone(MOSCOW_TZ)
-                    local_end = pytz.UTC.localize(new_end).astimezone(MOSCOW_TZ)
-
-                    text = (
-                        f"Встреча перенесена:\n{e['title']}\n"
-                        f"Новое время: {local_start.strftime('%H:%M')} - {local_end.strftime('%H:%M')}"
-                    )
-                    if existing.is_technical:
-                        text += "\n(Тех.встреча)"
-                    overlap = is_overlap_with_support_planning(local_start, local_end)
-                    if overlap:
-                        text += "\n‼️ Внимание встреча пересекается с планеркой отдела тех.поддержки, перенесите встречу!!!"
-
-                    try:
-                        await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=text)
-                    except Exception:
-                        logger.exception("Failed to send 'moved' event.")
+                await apply_event_changes(bot, db_sess, existing, e, changes)
 
         # Проверяем, чего нет среди current_ids => "отменено"
-        all_db_events = db_sess.query(Event).all()
+        # (только сегодняшние строки, по индексу events(start_time))
+        all_db_events = db_sess.query(Event).filter(*Event.on_local_day(now_msk.date())).all()
         for db_ev in all_db_events:
-            local_start = pytz.UTC.localize(db_ev.start_time).astimezone(MOSCOW_TZ)
-            if local_start.date() == now_msk.date():
+            if to_local(db_ev.start_time).date() == now_msk.date():
                 if db_ev.event_id not in current_ids:
-                    local_end = pytz.UTC.localize(db_ev.end_time).astimezone(MOSCOW_TZ)
-                    if local_end > now_msk:
+                    if to_local(db_ev.end_time) > now_msk:
                         canceled_text = f"Встреча отменена:\n{db_ev.title}"
                         try:
                             await bot.send_message(chat_id=BotConfig.SALES_CHAT_ID, text=canceled_text)
                         except Exception:
                             logger.exception("Failed to send canceled event.")
+                    if db_ev.is_taken and db_ev.taken_by:
+                        StatsRollup.add(db_sess, db_ev.start_time, db_ev.taken_by, db_ev.is_technical, -1)
+                    ReminderScheduler.cancel(db_ev.event_id)
+                    ConflictDetector.remove(db_ev.event_id)
+                    FreeSlotFinder.invalidate()
+                    MeetingLists.invalidate()
                     db_sess.delete(db_ev)
                     db_sess.commit()
     finally:
@@ -302,14 +405,12 @@ async def check_for_updates(bot: Bot):
 
 async def monthly_stats(bot: Bot):
     logger.debug("monthly_stats() called.")
-    now_msk = datetime.now(MOSCOW_TZ)
-    start_of_month = datetime(now_msk.year, now_msk.month, 1, 0, 0, 0, tzinfo=MOSCOW_TZ)
-    end_of_month = datetime(now_msk.year, now_msk.month, now_msk.day, 23, 59, 59, tzinfo=MOSCOW_TZ)
+    today = moscow_now().date()
 
     db_sess = Database.get_session()
     try:
-        start_of_month_utc = start_of_month.astimezone(pytz.UTC).replace(tzinfo=None)
-        end_of_month_utc = end_of_month.astimezone(pytz.UTC).replace(tzinfo=None)
+        start_of_month_utc = day_start_utc(today.replace(day=1))
+        end_of_month_utc = day_start_utc(today + timedelta(days=1))
 
         events_month = db_sess.query(Event).filter(
             Event.start_time >= start_of_month_utc,
@@ -351,20 +452,54 @@ async def monthly_stats(bot: Bot):
     finally:
         db_sess.close()
 
+async def conflicts_report(bot: Bot):
+    """
+    Ежедневный отчёт о пересечениях взятых встреч у сотрудников.
+    При взятии пересечения не допускаются, так что сюда попадают
+    только последствия переносов из check_for_updates.
+    """
+    logger.debug("conflicts_report() called.")
+    ConflictDetector.prune(utc_now())
+    pairs = ConflictDetector.sweep()
+    if not pairs:
+        logger.info("No meeting conflicts found.")
+        return
+
+    msg_lines = ["Пересечения взятых встреч:"]
+    for user, (start_a, title_a), (start_b, title_b) in pairs:
+        local_a = to_local(start_a)
+        local_b = to_local(start_b)
+        msg_lines.append(
+            f"@{user}: {local_a.strftime('%d.%m %H:%M')} {title_a} ⟷ "
+            f"{local_b.strftime('%d.%m %H:%M')} {title_b}"
+        )
+    msg_text = "\n".join(msg_lines)
+
+    try:
+        await bot.send_message(chat_id=BotConfig.SUPPORT_CHAT_ID, text=msg_text)
+    except Exception:
+        logger.exception("Failed to send conflicts report.")
+
 async def clean_old_data():
+    """
+    Удаляет события старше 60 дней. Статистика по ним уже лежит
+    в event_daily_stats (StatsRollup) и удалением не затрагивается.
+    """
     logger.debug("clean_old_data() called.")
-    now_msk = datetime.now(MOSCOW_TZ)
+    now_msk = moscow_now()
     cutoff = now_msk - timedelta(days=60)
     db_sess = Database.get_session()
     try:
-        cutoff_utc = cutoff.astimezone(pytz.UTC).replace(tzinfo=None)
+        cutoff_utc = to_utc(cutoff)
         old_events = db_sess.query(Event).filter(Event.end_time < cutoff_utc).all()
         for ev in old_events:
             logger.debug("Deleting old event %s / %s", ev.event_id, ev.title)
             db_sess.delete(ev)
+        db_sess.query(CalendarSnapshot).filter(CalendarSnapshot.day < cutoff.date()).delete()
         db_sess.commit()
     finally:
         db_sess.close()
+    ConflictDetector.prune(cutoff_utc)
 
 async def main():
     logger.info("Starting main() ... Decrypting bot token.")
@@ -377,15 +512,22 @@ async def main():
     bot = Bot(token=decrypted_token, parse_mode="HTML")
     dp = Dispatcher()
 
+    commands_router.message.middleware(HandlerTimingMiddleware())
+    callbacks_router.callback_query.middleware(HandlerTimingMiddleware())
     dp.include_router(commands_router)
     dp.include_router(callbacks_router)
 
-    scheduler = AsyncIOScheduler(timezone=MOSCOW_TZ)
+    scheduler = AsyncIOScheduler(timezone=MOSCOW_ZONE)
 
+    # Снимок календаря перед утренним оповещением
+    scheduler.add_job(
+        prefetch_today_events, "cron",
+        hour=max(BotConfig.MORNING_REPORT_HOUR - 1, 0), minute=45
+    )
     # Утреннее оповещение
     scheduler.add_job(
         morning_today_events, "cron",
-        hour=7, minute=0,
+        hour=BotConfig.MORNING_REPORT_HOUR, minute=0,
         args=[bot]
     )
     # Проверка каждые 30 минут
@@ -400,6 +542,12 @@ async def main():
         day="last", hour=BotConfig.DAILY_NOTIFICATION_HOUR, minute=0,
         args=[bot]
     )
+    # Отчёт о пересечениях взятых встреч (ежедневно)
+    scheduler.add_job(
+        conflicts_report, "cron",
+        hour=BotConfig.DAILY_NOTIFICATION_HOUR, minute=5,
+        args=[bot]
+    )
     # Очистка старых записей (последний день месяца, 20:10)
     scheduler.add_job(
         clean_old_data, "cron",
@@ -408,7 +556,11 @@ async def main():
 
     scheduler.start()
 
+    LoopWatchdog.start()
     await on_startup()
+    StatsRollup.backfill()
+    ReminderScheduler.start(bot)
+    ConflictDetector.load()
     logger.info("Dispatcher start_polling() now ...")
     await dp.start_polling(bot)
 
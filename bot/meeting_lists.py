@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from bot.calendar_service import CalendarService
+from bot.db import Database
+from bot.event_record import MOSCOW_ZONE, day_start_utc, is_excluded_planerka, to_local
+from bot.models.events import Event
+
+logger = logging.getLogger(__name__)
+
+WEEK_DAYS = 7
+# Сколько живёт кэш /week: будущие дни check_for_updates не отслеживает,
+# поэтому список недели перечитывается из календаря не реже этого
+WEEK_CACHE_SECONDS = 10 * 60
+# Сколько /week ждёт календарь; дальше отвечает встречами, известными боту,
+# а запрос продолжается в фоне и заполнит кэш для следующих вызовов
+WEEK_WAIT_SECONDS = 15
+
+def format_meeting_line(title: str, start_time, end_time, is_technical: bool, taken_by) -> str:
+    line = f"{to_local(start_time).strftime('%H:%M')} - {to_local(end_time).strftime('%H:%M')} {title}"
+    if is_technical:
+        line += " (тех.)"
+    if taken_by:
+        line += f" — @{taken_by}"
+    else:
+        line += " — свободна"
+    return line
+
+def format_meeting(ev) -> str:
+    return format_meeting_line(
+        ev.title, ev.start_time, ev.end_time, ev.is_technical,
+        ev.taken_by if ev.is_taken else None
+    )
+
+class MeetingLists:
+    """
+    Ответы для /today, /week и /my.
+
+    /today и /my — range-запросы по индексам events(start_time) и
+    events(taken_by, start_time). В events попадают только встречи
+    текущего дня, поэтому /week берёт 7 дней из календаря
+    (CalendarService.fetch) и дополняет их отметками о взятии из events.
+    Готовый текст кэшируется до invalidate() (check_for_updates,
+    взятие/отказ) или до смены дня, /week — ещё и не дольше
+    WEEK_CACHE_SECONDS. Запрос недели к календарю один на всех: параллельные
+    /week ждут одну и ту же задачу.
+    """
+    _cache = {}   # key -> (text, monotonic-время устаревания или None)
+    _cache_day = None
+    # Растёт при invalidate(): текст, собранный до сброса, в кэш не кладём
+    _generation = 0
+    _week_task = None
+    _week_task_day = None
+
+    @classmethod
+    def invalidate(cls):
+        cls._cache.clear()
+        cls._generation += 1
+
+    @classmethod
+    def _get(cls, key, today: date):
+        if cls._cache_day != today:
+            cls._cache.clear()
+            cls._cache_day = today
+        entry = cls._cache.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            return None
+        return entry[0]
+
+    @classmethod
+    def _put(cls, key, text: str, ttl: float = None):
+        cls._cache[key] = (text, None if ttl is None else time.monotonic() + ttl)
+
+    @classmethod
+    def _cached(cls, key, today: date, build):
+        text = cls._get(key, today)
+        if text is None:
+            text = build()
+            cls._put(key, text)
+        return text
+
+    @classmethod
+    def _query_range(cls, first_day: date, days: int):
+        db_sess = Database.get_session()
+        try:
+            return db_sess.query(
+                Event.title, Event.start_time, Event.end_time,
+                Event.is_taken, Event.taken_by, Event.is_technical
+            ).filter(
+                Event.start_time >= day_start_utc(first_day),
+                Event.start_time < day_start_utc(first_day + timedelta(days=days))
+            ).order_by(Event.start_time).all()
+        finally:
+            db_sess.close()
+
+    @classmethod
+    def today(cls, today: date) -> str:
+        def build():
+            rows = cls._query_range(today, 1)
+            if not rows:
+                return f"На сегодня ({today.strftime('%d.%m')}) встреч нет."
+            lines = [f"Встречи на сегодня ({today.strftime('%d.%m')}):"]
+            lines.extend(format_meeting(ev) for ev in rows)
+            return "\n".join(lines)
+        return cls._cached(("today",), today, build)
+
+    @classmethod
+    async def week(cls, today: date) -> str:
+        text = cls._get(("week",), today)
+        if text is not None:
+            return text
+
+        if cls._week_task is None or cls._week_task.done() or cls._week_task_day != today:
+            cls._week_task_day = today
+            cls._week_task = asyncio.create_task(cls._build_and_cache_week(today))
+        try:
+            return await asyncio.wait_for(asyncio.shield(cls._week_task), timeout=WEEK_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Calendar is slow for /week, using known meetings.")
+            return cls._known_week(today, "(Календарь отвечает медленно, показаны только встречи, известные боту)")
+
+    @classmethod
+    async def _build_and_cache_week(cls, today: date) -> str:
+        generation = cls._generation
+        text, fresh = await cls._build_week(today)
+        if cls._generation == generation:
+            # Ответ без календаря держим недолго — до следующей попытки
+            cls._put(("week",), text, ttl=WEEK_CACHE_SECONDS if fresh else 60)
+        return text
+
+    @classmethod
+    def _known_week(cls, today: date, note: str) -> str:
+        """/week по строкам events — когда календарь недоступен."""
+        rows = cls._query_range(today, WEEK_DAYS)
+        return cls._format_week([(ev.start_time, format_meeting(ev)) for ev in rows], note)
+
+    @classmethod
+    async def _build_week(cls, today: date):
+        """Текст /week и признак того, что он построен по календарю."""
+        week_start = datetime(today.year, today.month, today.day, tzinfo=MOSCOW_ZONE)
+        try:
+            records = await CalendarService.fetch(week_start, week_start + timedelta(days=WEEK_DAYS))
+        except Exception as exc:
+            logger.warning("Calendar is unavailable for /week, using known meetings: %r", exc)
+            return cls._known_week(today, "(Календарь не ответил, показаны только встречи, известные боту)"), False
+
+        last_day = today + timedelta(days=WEEK_DAYS)
+        records = sorted(
+            (r for r in records if today <= r.local_start.date() < last_day and not is_excluded_planerka(r.title)),
+            key=lambda r: r.start
+        )
+
+        # Отметки о взятии — из events; ключ с датой, потому что у
+        # повторяющихся встреч event_id общий для всех вхождений
+        db_sess = Database.get_session()
+        try:
+            rows = db_sess.query(
+                Event.event_id, Event.start_time, Event.is_taken, Event.taken_by
+            ).filter(
+                Event.event_id.in_({r.event_id for r in records}),
+                Event.start_time >= day_start_utc(today),
+                Event.start_time < day_start_utc(last_day)
+            ).all()
+        finally:
+            db_sess.close()
+        taken = {
+            (row.event_id, to_local(row.start_time).date()): row.taken_by
+            for row in rows
+            if row.is_taken and row.taken_by
+        }
+
+        items = [
+            (r.start, format_meeting_line(
+                r.title, r.start, r.end, r.is_technical,
+                taken.get((r.event_id, r.local_start.date()))
+            ))
+            for r in records
+        ]
+        return cls._format_week(items), True
+
+    @staticmethod
+    def _format_week(items, note: str = None) -> str:
+        """items — [(start_time "naive UTC", строка встречи), ...] по возрастанию времени."""
+        if not items:
+            text = "На ближайшую неделю встреч нет."
+            return f"{text}\n{note}" if note else text
+        lines = ["Встречи на неделю:"]
+        if note:
+            lines.append(note)
+        current_day = None
+        for start_time, line in items:
+            local_day = to_local(start_time).date()
+            if local_day != current_day:
+                current_day = local_day
+                lines.append(f"\n{local_day.strftime('%d.%m')}:")
+            lines.append(line)
+        return "\n".join(lines)
+
+    @classmethod
+    def my(cls, today: date, taken_by: str) -> str:
+        def build():
+            db_sess = Database.get_session()
+            try:
+                rows = db_sess.query(
+                    Event.title, Event.start_time, Event.end_time,
+                    Event.is_taken, Event.taken_by, Event.is_technical
+                ).filter(
+                    Event.taken_by == taken_by,
+                    Event.start_time >= day_start_utc(today)
+                ).order_by(Event.start_time).all()
+            finally:
+                db_sess.close()
+            if not rows:
+                return "У вас нет взятых встреч."
+            lines = ["Ваши встречи:"]
+            for ev in rows:
+                lines.append(f"{to_local(ev.start_time).strftime('%d.%m')} {format_meeting(ev)}")
+            return "\n".join(lines)
+        return cls._cached(("my", taken_by), today, build)
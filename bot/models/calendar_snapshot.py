@@ -0,0 +1,23 @@
+import logging
+from sqlalchemy import Column, Date, DateTime, JSON
+from bot.db import Base
+
+logger = logging.getLogger(__name__)
+
+class CalendarSnapshot(Base):
+    """
+    Последний удачный ответ CalDAV за день (по Москве).
+    Нужен, чтобы утренняя рассылка работала, даже если календарь недоступен.
+    """
+    __tablename__ = "calendar_snapshots"
+
+    day = Column(Date, primary_key=True)
+    # "naive UTC"
+    fetched_at = Column(DateTime)
+    # Список событий: event_id, title, start, end (isoformat, "naive UTC"),
+    # recurrence_id;
+    # при чтении из них заново строятся EventRecord
+    events = Column(JSON)
+
+    def __repr__(self):
+        return f"<CalendarSnapshot day={self.day}, fetched_at={self.fetched_at}>"
@@ -0,0 +1,27 @@
+import logging
+from sqlalchemy import Column, Integer, String, Boolean, Date, UniqueConstraint
+from bot.db import Base
+
+logger = logging.getLogger(__name__)
+
+class EventDailyStat(Base):
+    """
+    Свёртка взятых встреч: день (по Москве) × сотрудник × тех.флаг.
+    Не чистится вместе с events, поэтому хранит историю за любой период.
+    """
+    __tablename__ = "event_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("day", "taken_by", "is_technical", name="uq_event_daily_stats_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, index=True)
+    taken_by = Column(String)
+    is_technical = Column(Boolean, default=False)
+    taken_count = Column(Integer, default=0)
+
+    def __repr__(self):
+        return (
+            f"<EventDailyStat day={self.day}, taken_by={self.taken_by}, "
+            f"is_technical={self.is_technical}, taken_count={self.taken_count}>"
+        )
@@ -1,26 +1,52 @@
 import logging
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from datetime import timedelta
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from bot.db import Base
+from bot.event_record import day_start_utc
 
 logger = logging.getLogger(__name__)
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Для /my: взятые сотрудником встречи по времени
+        Index("ix_events_taken_by_start_time", "taken_by", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True)
     event_id = Column(String, index=True)
     title = Column(String)
 
     # Храним start_time/end_time в "naive UTC" (тип просто DateTime)
-    start_time = Column(DateTime)
+    start_time = Column(DateTime, index=True)
     end_time = Column(DateTime)
 
     is_taken = Column(Boolean, default=False)
     taken_by = Column(String, nullable=True)
+    # Telegram id взявшего — нужен, чтобы писать ему в личку (напоминания)
+    taken_by_user_id = Column(String, nullable=True)
 
     # Флаг для учёта «технической встречи»
     is_technical = Column(Boolean, default=False)
 
+    # Отпечаток последней увиденной версии из календаря (EventRecord.content_hash)
+    fingerprint = Column(String, nullable=True)
+
+    # Когда взявшему отправлено напоминание ("naive UTC"); NULL — ещё не отправлено
+    reminded_at = Column(DateTime, nullable=True)
+
+    @classmethod
+    def on_local_day(cls, day):
+        """
+        Условия на строки московского дня day (по индексу events(start_time)).
+        У повторяющейся встречи event_id (UID) общий для всех вхождений,
+        поэтому строку по событию календаря ищем в пределах его дня.
+        """
+        return (
+            cls.start_time >= day_start_utc(day),
+            cls.start_time < day_start_utc(day + timedelta(days=1))
+        )
+
     def __repr__(self):
         return (
             f"<Event event_id={self.event_id}, title={self.title}, "
@@ -0,0 +1,142 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+
+from bot.config import BotConfig
+from bot.db import Database
+from bot.event_record import to_local, utc_now
+from bot.models.events import Event
+
+logger = logging.getLogger(__name__)
+
+class ReminderScheduler:
+    """
+    Личные напоминания о взятых встречах.
+
+    Ближайшие напоминания лежат в min-heap по времени отправки, одна
+    фоновая задача спит до вершины кучи. Отмена/перенос — ленивые:
+    актуальная запись хранится в _entries, устаревшие элементы кучи
+    просто пропускаются при извлечении.
+    """
+    _bot = None
+    _task = None
+    _wakeup = None
+    _heap = []      # (remind_at, seq, event_id)
+    _entries = {}   # event_id -> (remind_at, seq, user_id, title, start_time, end_time)
+    _seq = itertools.count()
+
+    @classmethod
+    def start(cls, bot: Bot):
+        cls._bot = bot
+        cls._wakeup = asyncio.Event()
+        cls.rebuild()
+        cls._task = asyncio.create_task(cls._run())
+        logger.info("ReminderScheduler started with %d reminders.", len(cls._entries))
+
+    @classmethod
+    def rebuild(cls):
+        """Заполняет кучу одним запросом по индексу events(start_time)."""
+        cls._heap = []
+        cls._entries = {}
+        db_sess = Database.get_session()
+        try:
+            rows = db_sess.query(
+                Event.event_id, Event.title, Event.start_time, Event.end_time, Event.taken_by_user_id
+            ).filter(
+                Event.start_time > utc_now(),
+                Event.is_taken.is_(True),
+                Event.taken_by_user_id.isnot(None),
+                Event.reminded_at.is_(None)
+            ).all()
+        finally:
+            db_sess.close()
+
+        for row in rows:
+            cls.schedule(row.event_id, row.taken_by_user_id, row.title, row.start_time, row.end_time)
+
+    @classmethod
+    def schedule(cls, event_id: str, user_id, title: str, start_time: datetime, end_time: datetime):
+        """
+        Ставит (или переставляет) напоминание по встрече.
+        start_time/end_time — "naive UTC".
+        """
+        if start_time <= utc_now():
+            cls.cancel(event_id)
+            return
+
+        remind_at = start_time - timedelta(minutes=BotConfig.REMINDER_MINUTES)
+        seq = next(cls._seq)
+        cls._entries[event_id] = (remind_at, seq, user_id, title, start_time, end_time)
+        heapq.heappush(cls._heap, (remind_at, seq, event_id))
+        logger.debug("Reminder for %s scheduled at %s (user %s)", event_id, remind_at, user_id)
+
+        if cls._wakeup is not None and cls._heap[0][1] == seq:
+            cls._wakeup.set()
+
+    @classmethod
+    def cancel(cls, event_id: str):
+        if cls._entries.pop(event_id, None) is not None:
+            logger.debug("Reminder for %s canceled.", event_id)
+
+    @classmethod
+    def _is_current(cls, item) -> bool:
+        entry = cls._entries.get(item[2])
+        return entry is not None and entry[1] == item[1]
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            while cls._heap and not cls._is_current(cls._heap[0]):
+                heapq.heappop(cls._heap)
+
+            cls._wakeup.clear()
+            if not cls._heap:
+                await cls._wakeup.wait()
+                continue
+
+            delay = (cls._heap[0][0] - utc_now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            item = heapq.heappop(cls._heap)
+            if cls._is_current(item):
+                entry = cls._entries.pop(item[2])
+                await cls._send(item[2], *entry[2:])
+
+    @classmethod
+    async def _send(cls, event_id: str, user_id, title: str, start_time: datetime, end_time: datetime):
+        local_start = to_local(start_time)
+        local_end = to_local(end_time)
+        minutes_left = max(0, int((start_time - utc_now()).total_seconds() // 60))
+        text = (
+            f"Напоминание: через {minutes_left} мин. начинается ваша встреча\n"
+            f"{title}\n"
+            f"{local_start.strftime('%H:%M')} - {local_end.strftime('%H:%M')}"
+        )
+        try:
+            await cls._bot.send_message(chat_id=user_id, text=text)
+        except Exception:
+            logger.exception("Failed to send reminder to %s.", user_id)
+        cls._mark_reminded(event_id, start_time)
+
+    @staticmethod
+    def _mark_reminded(event_id: str, start_time: datetime):
+        """Запоминаем отправку в БД, чтобы после рестарта rebuild() не повторил её."""
+        db_sess = Database.get_session()
+        try:
+            db_sess.query(Event).filter(Event.event_id == event_id, Event.start_time == start_time).update(
+                {Event.reminded_at: utc_now()}, synchronize_session=False
+            )
+            db_sess.commit()
+        except Exception:
+            logger.exception("Failed to mark reminder for %s as sent.", event_id)
+        finally:
+            db_sess.close()
@@ -0,0 +1,79 @@
+import logging
+from datetime import date
+
+from sqlalchemy import case, func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from bot.db import Database
+from bot.event_record import to_local
+from bot.models.event_stats import EventDailyStat
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_SQL = """
+    INSERT INTO event_daily_stats (day, taken_by, is_technical, taken_count)
+    SELECT date((start_time AT TIME ZONE 'UTC') AT TIME ZONE 'Europe/Moscow'),
+           taken_by, coalesce(is_technical, false), count(*)
+    FROM events
+    WHERE is_taken AND taken_by IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+class StatsRollup:
+    """
+    Инкрементальная свёртка взятых встреч в event_daily_stats.
+    Изменения пишутся в той же сессии, что и сама встреча,
+    коммит остаётся за вызывающим кодом.
+    """
+
+    @staticmethod
+    def local_day(start_time) -> date:
+        return to_local(start_time).date()
+
+    @classmethod
+    def add(cls, db_sess, start_time, taken_by: str, is_technical: bool, delta: int):
+        stmt = insert(EventDailyStat).values(
+            day=cls.local_day(start_time),
+            taken_by=taken_by,
+            is_technical=bool(is_technical),
+            taken_count=delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_event_daily_stats_key",
+            set_={"taken_count": EventDailyStat.taken_count + delta}
+        )
+        db_sess.execute(stmt)
+
+    @classmethod
+    def backfill(cls):
+        """При первом запуске заполняет свёртку из того, что ещё лежит в events."""
+        db_sess = Database.get_session()
+        try:
+            if db_sess.query(EventDailyStat.id).first() is not None:
+                return
+            db_sess.execute(text(BACKFILL_SQL))
+            db_sess.commit()
+            logger.info("event_daily_stats backfilled from events.")
+        finally:
+            db_sess.close()
+
+    @classmethod
+    def totals(cls, first_day: date, last_day: date):
+        """
+        Суммы за [first_day, last_day] по месяцам и сотрудникам:
+        [(month_date, taken_by, count, tech_count), ...]
+        """
+        month = func.date_trunc("month", EventDailyStat.day)
+        db_sess = Database.get_session()
+        try:
+            return db_sess.query(
+                month,
+                EventDailyStat.taken_by,
+                func.sum(EventDailyStat.taken_count),
+                func.sum(case((EventDailyStat.is_technical.is_(True), EventDailyStat.taken_count), else_=0))
+            ).filter(
+                EventDailyStat.day >= first_day,
+                EventDailyStat.day <= last_day
+            ).group_by(month, EventDailyStat.taken_by).order_by(month).all()
+        finally:
+            db_sess.close()
@@ -0,0 +1,139 @@
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import traceback
+
+from aiogram import BaseMiddleware
+
+from bot.config import BotConfig
+
+logger = logging.getLogger(__name__)
+
+# Как часто тикает watchdog, секунды
+TICK_SECONDS = 0.25
+
+class LoopWatchdog:
+    """
+    Следит за задержкой event loop.
+
+    Задача в самом loop тикает каждые TICK_SECONDS и меряет, насколько
+    позже ожидаемого она проснулась. Отдельный поток смотрит на время
+    последнего тика: если loop стоит дольше порога, в лог пишется стек
+    потока loop — то есть код, который его сейчас блокирует.
+    """
+    _loop_thread_id = None
+    _last_tick = None
+    _task = None
+    _thread = None
+    max_lag = 0.0
+    last_lag = 0.0
+    stalls = 0
+
+    @classmethod
+    def start(cls):
+        cls._loop_thread_id = threading.get_ident()
+        cls._last_tick = time.monotonic()
+        cls._task = asyncio.create_task(cls._tick())
+        cls._thread = threading.Thread(target=cls._monitor, name="loop-watchdog", daemon=True)
+        cls._thread.start()
+        logger.info("LoopWatchdog started, threshold=%d ms.", BotConfig.LOOP_LAG_THRESHOLD_MS)
+
+    @classmethod
+    async def _tick(cls):
+        threshold = BotConfig.LOOP_LAG_THRESHOLD_MS / 1000
+        while True:
+            expected = time.monotonic() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            now = time.monotonic()
+            cls._last_tick = now
+            cls.last_lag = max(0.0, now - expected)
+            cls.max_lag = max(cls.max_lag, cls.last_lag)
+            if cls.last_lag > threshold:
+                logger.warning("Event loop lag: %.0f ms", cls.last_lag * 1000)
+
+    @classmethod
+    def _monitor(cls):
+        threshold = BotConfig.LOOP_LAG_THRESHOLD_MS / 1000
+        reported_tick = None
+        while True:
+            time.sleep(TICK_SECONDS)
+            last_tick = cls._last_tick
+            stalled = time.monotonic() - last_tick
+            if stalled > threshold and reported_tick != last_tick:
+                reported_tick = last_tick
+                cls.stalls += 1
+                frame = sys._current_frames().get(cls._loop_thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>\n"
+                logger.warning("Event loop blocked for %.0f ms, loop thread stack:\n%s", stalled * 1000, stack)
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """
+    Время работы обработчиков: имя -> [вызовов, суммарно сек., максимум сек.].
+    Медленные вызовы (дольше LOOP_LAG_THRESHOLD_MS) пишутся в лог.
+    """
+    stats = {}
+
+    async def __call__(self, handler, event, data):
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - started
+            handler_obj = data.get("handler")
+            name = handler_obj.callback.__name__ if handler_obj else type(event).__name__
+            entry = self.stats.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            if elapsed * 1000 > BotConfig.LOOP_LAG_THRESHOLD_MS:
+                logger.warning("Handler %s took %.0f ms", name, elapsed * 1000)
+
+class Profiler:
+    """cProfile работающего бота на ограниченное время (одновременно — один)."""
+    _running = False
+    _task = None
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._running
+
+    @classmethod
+    def start(cls, seconds: float, on_report):
+        """
+        Запускает capture() фоновой задачей, чтобы обработчик команды не
+        висел всё время профилирования. Готовый отчёт передаётся в
+        корутину on_report(report).
+        """
+        cls._running = True
+        cls._task = asyncio.create_task(cls._capture_and_report(seconds, on_report))
+
+    @classmethod
+    async def _capture_and_report(cls, seconds: float, on_report):
+        try:
+            report = await cls.capture(seconds)
+            await on_report(report)
+        except Exception:
+            logger.exception("Profiling failed.")
+        finally:
+            cls._running = False
+
+    @classmethod
+    async def capture(cls, seconds: float, limit: int = 40) -> str:
+        """Профилирует loop seconds секунд, возвращает отчёт pstats (по cumulative)."""
+        cls._running = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+            cls._running = False
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
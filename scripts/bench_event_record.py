@@ -0,0 +1,141 @@
+"""
+Бенчмарк нормализации событий календаря: прежние dict + pytz-перелокализация
+в каждом проходе против EventRecord.build() один раз на событие.
+
+Один "цикл" повторяет то, что бот делает с ответом календаря:
+  - фильтр встреч на сегодня (локальная дата начала);
+  - исключение планёрок и сообщение по встрече (время начала/конца,
+    тех.флаг, пересечение с планёркой);
+  - проверка изменений (те же поля ещё раз).
+Старый путь на каждом проходе заново переводит start/end в Москву и заново
+ищет ключевые слова, новый — один раз строит EventRecord и читает атрибуты.
+
+Замеряются время (timeit, лучший из --repeat) и пиковая память на хранение
+--events событий (tracemalloc).
+
+Запуск (из корня проекта, БД и календарь не нужны):
+    python -m scripts.bench_event_record --events 200 --repeat 5
+"""
+import argparse
+import random
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytz
+
+from bot.event_record import EventRecord, TECHNICAL_KEYWORDS, is_overlap_with_support_planning
+
+MOSCOW_TZ = pytz.timezone("Europe/Moscow")
+
+TITLES = (
+    "Демо продукта для клиента",
+    "Тех. встреча: интеграция с AD",
+    "Созвон по договору",
+    "Техническая консультация по RADIUS",
+    "Support планёрка",
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200, help="событий в одном ответе календаря")
+    parser.add_argument("--repeat", type=int, default=5, help="повторов timeit")
+    parser.add_argument("--number", type=int, default=50, help="циклов в одном повторе")
+    return parser.parse_args()
+
+def make_raw_events(count: int):
+    """Ответ календаря в прежнем виде: dict с "naive UTC" start/end."""
+    rnd = random.Random(42)
+    day = datetime(2024, 3, 4, 6, 0)  # понедельник, 09:00 по Москве
+    events = []
+    for i in range(count):
+        start = day + timedelta(minutes=15 * rnd.randrange(40))
+        events.append({
+            "event_id": f"event-{i}",
+            "title": rnd.choice(TITLES),
+            "start": start,
+            "end": start + timedelta(minutes=rnd.choice((30, 60, 90))),
+        })
+    return events
+
+def legacy_local(dt_utc: datetime) -> datetime:
+    return pytz.UTC.localize(dt_utc).astimezone(MOSCOW_TZ)
+
+def legacy_is_technical(title: str) -> bool:
+    lower_title = title.lower()
+    return any(k in lower_title for k in TECHNICAL_KEYWORDS)
+
+def legacy_cycle(raw_events, today):
+    # filter_today_events
+    events = [e for e in raw_events if legacy_local(e["start"]).date() == today]
+    events = [e for e in events if e["title"].lower().strip() != "support планёрка"]
+    lines = []
+    # Сообщения утренней рассылки, затем проверка изменений
+    for _ in range(2):
+        for e in events:
+            local_start = legacy_local(e["start"])
+            local_end = legacy_local(e["end"])
+            lines.append((
+                local_start.strftime("%H:%M"),
+                local_end.strftime("%H:%M"),
+                legacy_is_technical(e["title"]),
+                is_overlap_with_support_planning(local_start, local_end),
+            ))
+    return lines
+
+def build_records(raw_events):
+    return [EventRecord.build(e["event_id"], e["title"], e["start"], e["end"]) for e in raw_events]
+
+def record_cycle(raw_events, today):
+    records = build_records(raw_events)
+    events = [e for e in records if e.local_start.date() == today]
+    events = [e for e in events if e.title.lower().strip() != "support планёрка"]
+    lines = []
+    for _ in range(2):
+        for e in events:
+            lines.append((
+                e.local_start.strftime("%H:%M"),
+                e.local_end.strftime("%H:%M"),
+                e.is_technical,
+                e.overlaps_planning,
+            ))
+    return lines
+
+def peak_memory(build):
+    tracemalloc.start()
+    try:
+        kept = build()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return peak
+
+def main():
+    args = parse_args()
+    raw_events = make_raw_events(args.events)
+    today = legacy_local(raw_events[0]["start"]).date()
+
+    if legacy_cycle(raw_events, today) != record_cycle(raw_events, today):
+        raise SystemExit("FAIL: legacy and EventRecord paths disagree")
+
+    results = {}
+    for name, cycle in (("dict + pytz", legacy_cycle), ("EventRecord", record_cycle)):
+        best = min(timeit.repeat(lambda: cycle(raw_events, today), repeat=args.repeat, number=args.number))
+        results[name] = best / args.number
+
+    # Память: прежний путь держит dict и локальные datetime на каждом проходе,
+    # новый — один EventRecord на событие
+    legacy_peak = peak_memory(lambda: [
+        (e, legacy_local(e["start"]), legacy_local(e["end"])) for e in make_raw_events(args.events)
+    ])
+    record_peak = peak_memory(lambda: build_records(make_raw_events(args.events)))
+
+    print(f"events={args.events}")
+    for name, per_cycle in results.items():
+        print(f"{name:>12}: {per_cycle * 1000:.3f} ms/cycle")
+    print(f"speedup: {results['dict + pytz'] / results['EventRecord']:.2f}x")
+    print(f"peak memory: dict + pytz {legacy_peak / 1024:.1f} KiB, EventRecord {record_peak / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
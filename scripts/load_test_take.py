@@ -0,0 +1,149 @@
+"""
+Нагрузочный тест взятия встречи: N одновременных нажатий "Взять встречу".
+
+Создаёт в базе (настройки DB_* из окружения, как у бота) тестовое событие и
+N тестовых сотрудников, затем одновременно вызывает handle_take_meeting с
+подставным CallbackQuery — каждый в своём потоке. Проходит весь путь
+обработчика: проверка сотрудника, чтение события, проверка пересечений,
+условный UPDATE и StatsRollup.add в одной транзакции. Проверяется, что:
+  - выиграл ровно один (только ему пришла кнопка "Отказаться");
+  - в базе записан именно победитель;
+  - в event_daily_stats у победителя ровно одна встреча;
+  - максимальное время обработчика не превышает --max-latency-ms.
+Тестовые строки удаляются в конце.
+
+Обработчики работают через Database — тот же engine и тот же пул
+соединений, что и у бота, поэтому сотни нажатий не требуют сотен
+соединений: лишние ждут соединение из пула, и это ожидание входит
+в замеренную задержку.
+
+Запуск (из корня проекта, при поднятом PostgreSQL):
+    python -m scripts.load_test_take --workers 300 --max-latency-ms 5000
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+
+from bot.db import Database
+from bot.event_record import utc_now
+from bot.handlers.callbacks import handle_take_meeting
+from bot.models.employees import Employee
+from bot.models.event_stats import EventDailyStat
+from bot.models.events import Event
+from bot.stats import StatsRollup
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=300, help="число одновременных нажатий")
+    parser.add_argument("--max-latency-ms", type=float, default=5000, help="допустимое время одного обработчика")
+    return parser.parse_args()
+
+class FakeMessage:
+    def __init__(self):
+        self.text = None
+        self.markup = None
+
+    async def edit_text(self, text, reply_markup=None):
+        self.text = text
+        self.markup = reply_markup
+
+class FakeCallback:
+    """Ровно то, что handle_take_meeting читает из CallbackQuery."""
+    def __init__(self, user_id: int, username: str, event_id: str):
+        self.from_user = SimpleNamespace(id=user_id, username=username)
+        self.data = f"take:{event_id}"
+        self.message = FakeMessage()
+        self.alert = None
+
+    async def answer(self, text=None, show_alert=False):
+        if show_alert:
+            self.alert = text
+
+def got_decline_button(callback: FakeCallback) -> bool:
+    markup = callback.message.markup
+    return markup is not None and markup.inline_keyboard[0][0].callback_data.startswith("decline:")
+
+def main():
+    args = parse_args()
+    run_id = uuid.uuid4().hex[:8]
+    event_id = f"load-test-{run_id}"
+    base_user_id = 10 ** 12  # заведомо не пересекается с настоящими Telegram id
+    usernames = [f"loadtest{run_id}_{i}" for i in range(args.workers)]
+
+    start = utc_now().replace(second=0, microsecond=0) + timedelta(days=1)
+    db_sess = Database.get_session()
+    try:
+        db_sess.add(Event(event_id=event_id, title="load test", start_time=start,
+                          end_time=start + timedelta(hours=1), is_taken=False))
+        db_sess.add_all(
+            Employee(user_id=str(base_user_id + i), username=usernames[i]) for i in range(args.workers)
+        )
+        db_sess.commit()
+    finally:
+        db_sess.close()
+
+    barrier = threading.Barrier(args.workers)
+
+    def press(i):
+        callback = FakeCallback(base_user_id + i, usernames[i], event_id)
+        barrier.wait()
+        started = time.perf_counter()
+        asyncio.run(handle_take_meeting(callback))
+        return i, got_decline_button(callback), time.perf_counter() - started
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(press, range(args.workers)))
+
+        winners = [i for i, won, _ in results if won]
+        latencies = sorted(elapsed for _, _, elapsed in results)
+        db_sess = Database.get_session()
+        try:
+            stored = db_sess.query(Event.taken_by).filter(Event.event_id == event_id).scalar()
+            counted = db_sess.query(EventDailyStat.taken_by, EventDailyStat.taken_count).filter(
+                EventDailyStat.day == StatsRollup.local_day(start),
+                EventDailyStat.taken_by.in_(usernames)
+            ).all()
+        finally:
+            db_sess.close()
+    finally:
+        db_sess = Database.get_session()
+        try:
+            db_sess.query(Event).filter(Event.event_id == event_id).delete()
+            db_sess.query(Employee).filter(Employee.username.in_(usernames)).delete(synchronize_session=False)
+            db_sess.query(EventDailyStat).filter(EventDailyStat.taken_by.in_(usernames)).delete(synchronize_session=False)
+            db_sess.commit()
+        finally:
+            db_sess.close()
+
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    worst = latencies[-1] * 1000
+    print(f"workers={args.workers} winners={winners} stored={stored} stats={counted} "
+          f"p50={p50:.1f}ms p99={p99:.1f}ms max={worst:.1f}ms")
+
+    failures = []
+    if len(winners) != 1:
+        failures.append(f"expected exactly one winner, got {len(winners)}")
+    else:
+        winner = usernames[winners[0]]
+        if stored != winner:
+            failures.append(f"row taken_by={stored}, winner was {winner}")
+        if counted != [(winner, 1)]:
+            failures.append(f"event_daily_stats={counted}, expected [({winner!r}, 1)]")
+    if worst > args.max_latency_ms:
+        failures.append(f"max latency {worst:.1f}ms > {args.max_latency_ms}ms")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()